@@ -0,0 +1,276 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from emulator import Emulator, FRAME_RATE
+
+ROM_PATH = 'roms/Tetris.gb'
+INPUTS_PATH = 'roms/Tetris.inputs'
+
+# warmup = frames rodados (sem medir) antes do workload começar
+WORKLOADS = {
+    'boot': {'warmup': 0, 'frames': 120, 'inputs': None},
+    'title': {'warmup': 600, 'frames': 120, 'inputs': None},
+    'gameplay': {'warmup': 600, 'frames': 300, 'inputs': INPUTS_PATH},
+}
+
+# Programas repetidos em WRAM (0xC000) para medir CPU.step por classe de opcode.
+# (bytes do padrão, instruções por padrão)
+OPCODE_CLASSES = {
+    'nop': (b'\x00', 1),
+    'ld_r_r': (b'\x78', 1),         # LD A,B
+    'ld_r_d8': (b'\x3E\x42', 1),    # LD A,d8
+    'ld_r_(hl)': (b'\x7E', 1),      # LD A,(HL)
+    'alu': (b'\x80', 1),            # ADD A,B
+    'inc_dec': (b'\x04', 1),        # INC B
+    'jr': (b'\x18\x00', 1),         # JR +0
+    'push_pop': (b'\xC5\xC1', 2),   # PUSH BC / POP BC
+    'call_ret': (b'\xCD\x00\xD0', 2),  # CALL 0xD000 -> RET
+    'cb_prefix': (b'\xCB\x47', 1),  # BIT 0,A
+}
+MICRO_PROGRAM_START = 0xC000
+MICRO_PROGRAM_SIZE = 0x0C00
+
+# Processo novo até o primeiro frame emulado (o que cada worker de curta duração paga)
+COLD_START_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+from emulator import Emulator
+imported = time.perf_counter()
+Emulator(sys.argv[1]).run_frame()
+print(imported - start, time.perf_counter() - imported)
+'''
+
+
+def load_inputs(path):
+    """
+    Script de input em texto: '<frame> <botões separados por vírgula | ->'.
+    A partir daquele frame os botões listados ficam segurados ('-' solta tudo).
+    """
+    script = {}
+    with open(path) as file:
+        for line in file:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            frame, buttons = line.split()
+            script[int(frame)] = () if buttons == '-' else tuple(buttons.split(','))
+    return script
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_workload(emulator, frames, inputs):
+    start_instructions = emulator.instruction_count
+    run_frame = emulator.run_frame
+    set_buttons = emulator.mmu.set_buttons
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        if inputs and frame in inputs:
+            set_buttons(inputs[frame])
+        run_frame()
+    elapsed = time.perf_counter() - start
+
+    instructions = emulator.instruction_count - start_instructions
+    return {
+        'frames': frames,
+        'seconds': elapsed,
+        'instructions_per_second': instructions / elapsed,
+        'frames_per_second': frames / elapsed,
+        'realtime_speed': (frames / elapsed) / FRAME_RATE,
+    }
+
+
+def bench_workloads(rom_path, names, frames=None):
+    results = {}
+    base = Emulator(rom_path)
+    warmed = {0: base}
+
+    for name in names:
+        workload = WORKLOADS[name]
+        warmup = workload['warmup']
+
+        # Reaproveita o estado aquecido entre workloads com o mesmo warmup
+        if warmup not in warmed:
+            emulator = base.clone()
+            for _ in range(warmup):
+                emulator.run_frame()
+            warmed[warmup] = emulator
+
+        emulator = warmed[warmup].clone()
+        inputs = load_inputs(workload['inputs']) if workload['inputs'] else None
+        results[name] = run_workload(emulator, frames or workload['frames'], inputs)
+
+    return results
+
+
+def best_of(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_cpu(rom_path, repeat):
+    results = {}
+    emulator = Emulator(rom_path)
+    cpu = emulator.cpu
+    memory = emulator.mmu.memory
+
+    for name, (pattern, per_pattern) in OPCODE_CLASSES.items():
+        count = MICRO_PROGRAM_SIZE // len(pattern)
+        memory[MICRO_PROGRAM_START:MICRO_PROGRAM_START + count * len(pattern)] = pattern * count
+        memory[0xD000] = 0xC9  # RET para o call_ret
+        steps = count * per_pattern
+
+        def run():
+            cpu.PC = MICRO_PROGRAM_START
+            cpu.SP = 0xDFFE
+            cpu.H, cpu.L = 0xD1, 0x00
+            cpu.ime = False
+            step = cpu.step
+            for _ in range(steps):
+                step()
+
+        elapsed = best_of(run, repeat)
+        results[f'cpu_step[{name}]'] = {'calls': steps, 'ns_per_call': elapsed / steps * 1e9}
+
+    return results
+
+
+def bench_mmu_ppu(rom_path, repeat):
+    results = {}
+    emulator = Emulator(rom_path)
+    mmu = emulator.mmu
+    ppu = emulator.ppu
+    calls = 65536
+
+    def reads():
+        read_byte = mmu.read_byte
+        for address in range(calls):
+            read_byte(address)
+
+    def writes():
+        write_byte = mmu.write_byte
+        for i in range(calls):
+            write_byte(0xC000 + (i & 0x1FFF), i & 0xFF)
+
+    results['mmu.read_byte'] = {'calls': calls, 'ns_per_call': best_of(reads, repeat) / calls * 1e9}
+    results['mmu.write_byte'] = {'calls': calls, 'ns_per_call': best_of(writes, repeat) / calls * 1e9}
+
+    mmu.memory[0xFF40] = 0x91  # LCD ligado, senão render_screen retorna direto
+    renders = 20
+
+    def render():
+        for _ in range(renders):
+            ppu.render_screen()
+
+    results['ppu.render_screen'] = {'calls': renders, 'ns_per_call': best_of(render, repeat) / renders * 1e9}
+    return results
+
+
+def bench_cold_start(rom_path, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT, rom_path],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            import_seconds, frame_seconds = map(float, output.split()[-2:])
+            best = (elapsed, import_seconds, frame_seconds)
+
+    return {'cold_start': {
+        'seconds': best[0],
+        'import_seconds': best[1],
+        'first_frame_seconds': best[2],
+    }}
+
+
+def print_results(report, baseline=None):
+    previous = baseline['results'] if baseline else {}
+
+    for name, result in report['results'].items():
+        if 'first_frame_seconds' in result:
+            line = (f"{name:28} {result['seconds'] * 1000:12.1f} ms  "
+                    f"(import {result['import_seconds'] * 1000:.1f} ms, "
+                    f"primeiro frame {result['first_frame_seconds'] * 1000:.1f} ms)")
+            old = previous.get(name, {}).get('seconds')
+            if old:
+                line += f"   ({old / result['seconds']:.2f}x vs baseline)"
+        elif 'ns_per_call' in result:
+            line = f"{name:28} {result['ns_per_call']:12.0f} ns/call"
+            old = previous.get(name, {}).get('ns_per_call')
+            if old:
+                line += f"   ({old / result['ns_per_call']:.2f}x vs baseline)"
+        else:
+            line = (f"{name:28} {result['frames_per_second']:8.2f} fps  "
+                    f"{result['instructions_per_second']:12.0f} instr/s  "
+                    f"{result['realtime_speed'] * 100:6.1f}% tempo real")
+            old = previous.get(name, {}).get('frames_per_second')
+            if old:
+                line += f"   ({result['frames_per_second'] / old:.2f}x vs baseline)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de throughput do emulador (headless)')
+    parser.add_argument('--rom', default=ROM_PATH)
+    parser.add_argument('--workloads', nargs='*', default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument('--frames', type=int, help='sobrescreve o número de frames medidos')
+    parser.add_argument('--repeat', type=int, default=3, help='repetições dos microbenchmarks')
+    parser.add_argument('--no-micro', action='store_true', help='pula os microbenchmarks')
+    parser.add_argument('--no-cold-start', action='store_true',
+                        help='pula a medição de processo novo até o primeiro frame')
+    parser.add_argument('--json', help='salva os resultados neste arquivo')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar')
+    args = parser.parse_args()
+
+    results = {}
+    if args.workloads:
+        results.update(bench_workloads(args.rom, args.workloads, args.frames))
+    if not args.no_micro:
+        results.update(bench_cpu(args.rom, args.repeat))
+        results.update(bench_mmu_ppu(args.rom, args.repeat))
+    if not args.no_cold_start:
+        results.update(bench_cold_start(args.rom, args.repeat))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(report, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import os
+import queue
+import struct
+import subprocess
+import threading
+import zlib
+
+SCREEN_WIDTH = 160
+SCREEN_HEIGHT = 144
+FRAME_SIZE = SCREEN_WIDTH * SCREEN_HEIGHT * 3
+
+
+def encode_png(frame, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    # PNG RGB sem filtro: cada linha ganha o byte de filtro 0 e o zlib faz o resto (em C)
+    row = width * 3
+    raw = b''.join(b'\x00' + frame[y * row:(y + 1) * row] for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 6))
+            + chunk(b'IEND', b''))
+
+
+class FrameCapture:
+    """
+    Grava os frames sem travar a emulação.
+
+    capture() só copia o PPU.buffer para um dos buffers pré-alocados e coloca na
+    fila; compressão e I/O ficam numa thread (zlib e write liberam o GIL). Se todos
+    os buffers estiverem ocupados o frame é descartado e contado em dropped_frames:
+    quem perde é a gravação, nunca a emulação.
+
+    Os frames são numerados pela ordem de chegada, descartados inclusive:
+    mode='png': sequência out/frame_000000.png, com buracos nos frames descartados
+    mode='pipe': frames RGB crus no stdin de um encoder (o frame anterior é
+                 repetido no lugar dos descartados, para o vídeo não acelerar), ex:
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 160x144 -r 59.73 -i - out.mkv
+    """
+
+    def __init__(self, out, mode='png', command=None, buffers=32):
+        if mode not in ('png', 'pipe'):
+            raise ValueError(f'modo de captura inválido: {mode}')
+        if mode == 'pipe' and not command:
+            raise ValueError("modo 'pipe' precisa do comando do encoder")
+
+        self.out = out
+        self.mode = mode
+        self.command = command
+
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(bytearray(FRAME_SIZE))
+        self.pending = queue.Queue()
+
+        self.frame_index = 0
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.written_frames = 0
+        self.error = None
+
+        self.process = None
+        if mode == 'png':
+            os.makedirs(out, exist_ok=True)
+        else:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+        self.worker = threading.Thread(target=self._run, name='frame-capture', daemon=True)
+        self.worker.start()
+
+    def capture(self, framebuffer):
+        index = self.frame_index
+        self.frame_index += 1
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped_frames += 1
+            return False
+
+        buffer[:] = framebuffer
+        self.pending.put((index, buffer))
+        self.captured_frames += 1
+        return True
+
+    def _run(self):
+        next_index = 0
+        previous = None  # último frame enviado no modo pipe (repete nos descartados)
+        while True:
+            item = self.pending.get()
+            if item is None:
+                # Descartados depois do último frame gravado também ocupam tempo no vídeo
+                if self.mode == 'pipe' and previous is not None and self.error is None:
+                    try:
+                        for _ in range(self.frame_index - next_index):
+                            self.process.stdin.write(previous)
+                    except OSError as error:
+                        self.error = error
+                break
+            index, buffer = item
+            try:
+                if self.error is None:
+                    if self.mode == 'pipe' and previous is not None:
+                        for _ in range(index - next_index):
+                            self.process.stdin.write(previous)
+                    self._write(index, buffer)
+                    self.written_frames += 1
+                    if self.mode == 'pipe':
+                        previous = bytes(buffer)
+                next_index = index + 1
+            except OSError as error:
+                # Ex: encoder fechou o pipe; para de gravar mas não derruba o emulador
+                self.error = error
+            finally:
+                self.free.put(buffer)
+
+    def _write(self, index, buffer):
+        if self.mode == 'png':
+            with open(os.path.join(self.out, f'frame_{index:06d}.png'), 'wb') as file:
+                file.write(encode_png(buffer))
+        else:
+            self.process.stdin.write(buffer)
+
+    def close(self):
+        self.pending.put(None)
+        self.worker.join()
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            self.process.wait()
+
+    def stats(self):
+        return {
+            'captured_frames': self.captured_frames,
+            'written_frames': self.written_frames,
+            'dropped_frames': self.dropped_frames,
+            'queued_frames': self.pending.qsize(),
+            'error': str(self.error) if self.error is not None else None,
+        }
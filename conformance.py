@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import time
+import zlib
+from multiprocessing import Pool
+
+from emulator import Emulator
+
+TEST_ROM_DIR = 'roms/tests'
+
+# (suite, arquivo, método) — 'serial' procura Passed/Failed na saída serial,
+# 'hash' compara o crc32 do framebuffer com a referência do manifesto
+TEST_ROMS = [
+    ('cpu_instrs', 'cpu_instrs/individual/01-special.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/02-interrupts.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/03-op sp,hl.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/04-op r,imm.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/05-op rp.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/06-ld r,r.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/07-jr,jp,call,ret,rst.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/08-misc instrs.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/09-op r,r.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/10-bit ops.gb', 'serial'),
+    ('cpu_instrs', 'cpu_instrs/individual/11-op a,(hl).gb', 'serial'),
+    ('instr_timing', 'instr_timing/instr_timing.gb', 'serial'),
+    ('mem_timing', 'mem_timing/individual/01-read_timing.gb', 'serial'),
+    ('mem_timing', 'mem_timing/individual/02-write_timing.gb', 'serial'),
+    ('mem_timing', 'mem_timing/individual/03-modify_timing.gb', 'serial'),
+    ('dmg-acid2', 'dmg-acid2/dmg-acid2.gb', 'hash'),
+]
+
+# Sem MBC só cabem ROMs de 32kb no mapa de memória
+MAX_ROM_SIZE = 0x8000
+
+
+def run_test(job):
+    suite, rom, method, path, max_frames, expected_hash = job
+    result = {'suite': suite, 'rom': rom, 'method': method, 'frames': 0, 'seconds': 0.0}
+
+    if not os.path.exists(path):
+        result['status'] = 'missing'
+        return result
+    if os.path.getsize(path) > MAX_ROM_SIZE:
+        result['status'] = 'unsupported'
+        result['detail'] = 'ROM com MBC'
+        return result
+
+    emulator = Emulator(path)
+    serial = emulator.mmu.serial_output
+    start = time.perf_counter()
+    status = 'timeout'
+    frame = -1
+
+    for frame in range(max_frames):
+        emulator.run_frame()
+        if method == 'serial' and (b'Passed' in serial or b'Failed' in serial):
+            status = 'pass' if b'Passed' in serial else 'fail'
+            break
+
+    result['frames'] = frame + 1
+    result['seconds'] = time.perf_counter() - start
+
+    if method == 'hash':
+        frame_hash = f'{zlib.crc32(emulator.ppu.buffer):08x}'
+        result['hash'] = frame_hash
+        if expected_hash is None:
+            status = 'no-ref'
+        else:
+            status = 'pass' if frame_hash == expected_hash else 'fail'
+
+    output = serial.decode('ascii', 'replace').strip()
+    if output:
+        result['detail'] = output.splitlines()[-1]
+    result['status'] = status
+    return result
+
+
+def print_matrix(results):
+    width = max(len(r['rom']) for r in results)
+    print(f"{'suite':14} {'rom':{width}} {'status':12} {'frames':>7} {'s':>7}  detalhe")
+    for r in results:
+        print(f"{r['suite']:14} {r['rom']:{width}} {r['status']:12} {r['frames']:7} "
+              f"{r['seconds']:7.1f}  {r.get('detail', r.get('hash', ''))}")
+
+    print()
+    suites = sorted({r['suite'] for r in results})
+    statuses = ['pass', 'fail', 'timeout', 'no-ref', 'unsupported', 'missing']
+    print(f"{'suite':14} " + ' '.join(f'{s:>11}' for s in statuses))
+    for suite in suites:
+        counts = [sum(1 for r in results if r['suite'] == suite and r['status'] == s) for s in statuses]
+        print(f'{suite:14} ' + ' '.join(f'{c:11}' for c in counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roda as test ROMs headless em paralelo')
+    parser.add_argument('--dir', default=TEST_ROM_DIR, help='pasta com as test ROMs')
+    parser.add_argument('--frames', type=int, default=3600, help='limite de frames por ROM')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--suite', action='append', help='roda só estas suítes')
+    parser.add_argument('--hashes', help='JSON {rom: crc32} com as referências do método hash')
+    parser.add_argument('--json', help='salva os resultados neste arquivo')
+    parser.add_argument('--allow-no-ref', action='store_true',
+                        help="não reprova ROMs 'hash' sem referência (ex: para gerar o --hashes)")
+    parser.add_argument('--allow-unsupported', action='store_true',
+                        help='não reprova ROMs que o emulador não consegue carregar')
+    args = parser.parse_args()
+
+    hashes = {}
+    if args.hashes:
+        with open(args.hashes) as file:
+            hashes = json.load(file)
+
+    jobs = [
+        (suite, rom, method, os.path.join(args.dir, rom), args.frames, hashes.get(rom))
+        for suite, rom, method in TEST_ROMS
+        if not args.suite or suite in args.suite
+    ]
+
+    with Pool(args.workers) as pool:
+        results = pool.map(run_test, jobs, chunksize=1)
+
+    print_matrix(results)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    # Só 'pass' aprova: ROM ausente, sem referência ou não suportada é um teste que
+    # não rodou de verdade, e o gate não pode passar assim sem pedir explicitamente
+    allowed = {'pass'}
+    if args.allow_no_ref:
+        allowed.add('no-ref')
+    if args.allow_unsupported:
+        allowed.add('unsupported')
+    if any(r['status'] not in allowed for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,17 @@
 from mmu import MMU
 # from utils import _print # Logs desligados para performance
-from instruction_set import instructions
+from instruction_set import decoded
 
 FLAG_Z = 0x80
 FLAG_N = 0x40
 FLAG_H = 0x20
 FLAG_C = 0x10
 
+# Estado mutável da CPU (usado por clone/rewind)
+REGISTERS = ('A', 'F', 'B', 'C', 'D', 'E', 'H', 'L', 'SP', 'PC', 'ime')
+
 class CPU:
     def __init__(self, mmu: MMU):
-        print("CPU Blindada inicializada")
         self.mmu = mmu
 
         self.A = 0x01
@@ -26,6 +28,28 @@ class CPU:
         
         self.ime = False
 
+        self.rebuild_dispatch()
+
+    def clone(self, mmu):
+        # Evita o __init__ e copia só os registradores
+        new = CPU.__new__(CPU)
+        new.mmu = mmu
+        for name in REGISTERS:
+            setattr(new, name, getattr(self, name))
+        new.rebuild_dispatch()
+        return new
+
+    def rebuild_dispatch(self):
+        """
+        Tabela opcode => (handler já ligado, instrução, partes do nome).
+        Quem troca um op_* na instância (profiling, guest_profiler) precisa
+        chamar isso de novo para a troca valer.
+        """
+        self.dispatch = [
+            None if entry is None else (getattr(self, entry[1], None), entry[0], entry[2])
+            for entry in decoded
+        ]
+
     def step(self):
         self.handle_interrupts()
         
@@ -33,38 +57,20 @@ class CPU:
         self.PC &= 0xFFFF
         
         opcode = self.mmu.read_byte(self.PC)
+        entry = self.dispatch[opcode]
 
-        if opcode not in instructions:
+        if entry is None:
             # Em vez de fechar o emulador, pulamos a instrução inválida
             # Isso evita fechar a janela em caso de bugs menores
             self.PC = (self.PC + 1) & 0xFFFF
             return 4 
 
-        instr = instructions[opcode]
+        method, instr, parts = entry
         self.PC = (self.PC + 1) & 0xFFFF # Incremento seguro
 
-        if instr.name == "LD_HL_SP+r8":
-            parts = instr.name.split('_')
-            self.op_LD_HL_SP(instr, parts)
-            return instr.cycles
-        
-        # Dispatch Otimizado
-        op_name = instr.name
-        idx = op_name.find('_')
-        if idx != -1:
-            operation = op_name[:idx]
-            parts = op_name.split('_')
-        else:
-            operation = op_name
-            parts = [op_name]
-
-        method = getattr(self, f'op_{operation}', None)
-
-        if method:
+        # Sem handler implementado a instrução só gasta os ciclos
+        if method is not None:
             method(instr, parts)
-        else:
-            # print(f"Aviso: Handler não implementado para {instr.name}")
-            pass
 
         return instr.cycles
 
@@ -0,0 +1,336 @@
+import argparse
+import cmd
+
+import hooks
+from cpu import REGISTERS
+from instruction_set import instructions, disassemble
+
+
+# RET, RET cc e RETI
+RETURN_OPCODES = frozenset((0xC9, 0xC0, 0xC8, 0xD0, 0xD8, 0xD9))
+
+
+class DebuggerStop(Exception):
+    pass
+
+
+class Debugger:
+    """
+    Breakpoints e watchpoints sem custo quando não usados.
+
+    Enquanto houver algum breakpoint/watchpoint, um step "checado" é colocado como
+    atributo da instância da CPU; os watchpoints trocam read_byte/write_byte da MMU
+    por versões que só olham o endereço quando a página (address >> 8) está vigiada.
+    Sem nada definido os wrappers são removidos (via hooks, então os de
+    tracer.Tracer, profiling.Instrumentation etc. continuam valendo).
+
+    A parada é sempre levantada no início do próximo step, então a instrução que
+    disparou um watchpoint termina de executar (inclusive PPU/DIV no run_frame).
+    """
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+        self.cpu = emulator.cpu
+        self.mmu = emulator.mmu
+
+        self.breakpoints = set()
+        self.temporary_breakpoints = set()
+        self.watchpoints = {}    # endereço => 'r', 'w' ou 'rw'
+        self.watched_pages = set()
+        self.stop_condition = None
+
+        self.pending_stop = None
+        self.resuming = False
+
+    # --- instalação dos wrappers ---
+
+    def _update_hooks(self):
+        hooks.remove(self)
+
+        if self.watchpoints:
+            self._install_watchpoints()
+        if self.breakpoints or self.temporary_breakpoints or self.watchpoints or self.stop_condition:
+            self._install_checked_step()
+
+    def _install_checked_step(self):
+        cpu = self.cpu
+        breakpoints = self.breakpoints
+        temporary = self.temporary_breakpoints
+
+        def make_checked_step(step):
+            def checked_step():
+                if self.pending_stop is not None:
+                    reason, self.pending_stop = self.pending_stop, None
+                    raise DebuggerStop(reason)
+
+                if self.resuming:
+                    self.resuming = False
+                elif cpu.PC in breakpoints or cpu.PC in temporary:
+                    if cpu.PC in temporary:
+                        temporary.discard(cpu.PC)
+                        self._update_hooks()
+                    raise DebuggerStop(f'breakpoint em ${cpu.PC:04X}')
+
+                pc = cpu.PC
+                sp = cpu.SP
+                cycles = step()
+                if self.stop_condition is not None and self.stop_condition(pc, sp):
+                    self.pending_stop = 'finish'
+                return cycles
+            return checked_step
+
+        hooks.install(self, cpu, 'step', make_checked_step)
+
+    def _install_watchpoints(self):
+        mmu = self.mmu
+        watchpoints = self.watchpoints
+
+        def make_watched_read(read_byte):
+            def watched_read(address):
+                value = read_byte(address)
+                if address >> 8 in self.watched_pages and 'r' in watchpoints.get(address, ''):
+                    self.pending_stop = f'leitura de ${address:04X} = ${value:02X} (PC ${self.cpu.PC:04X})'
+                return value
+            return watched_read
+
+        def make_watched_write(write_byte):
+            def watched_write(address, value):
+                if address >> 8 in self.watched_pages and 'w' in watchpoints.get(address, ''):
+                    old = mmu.memory[address]
+                    self.pending_stop = (f'escrita em ${address:04X}: ${old:02X} -> ${value & 0xFF:02X} '
+                                         f'(PC ${self.cpu.PC:04X})')
+                return write_byte(address, value)
+            return watched_write
+
+        hooks.install(self, mmu, 'read_byte', make_watched_read)
+        hooks.install(self, mmu, 'write_byte', make_watched_write)
+
+    # --- breakpoints/watchpoints ---
+
+    def add_breakpoint(self, address):
+        self.breakpoints.add(address & 0xFFFF)
+        self._update_hooks()
+
+    def remove_breakpoint(self, address):
+        self.breakpoints.discard(address & 0xFFFF)
+        self._update_hooks()
+
+    def add_watchpoint(self, address, mode='rw'):
+        address &= 0xFFFF
+        self.watchpoints[address] = mode
+        self.watched_pages = {a >> 8 for a in self.watchpoints}
+        self._update_hooks()
+
+    def remove_watchpoint(self, address):
+        self.watchpoints.pop(address & 0xFFFF, None)
+        self.watched_pages = {a >> 8 for a in self.watchpoints}
+        self._update_hooks()
+
+    # --- execução ---
+
+    def run(self, max_frames=None):
+        """Roda frames até parar (retorna o motivo) ou até max_frames (retorna None)."""
+        self.resuming = True
+        frames = 0
+        try:
+            while max_frames is None or frames < max_frames:
+                self.emulator.run_frame()
+                frames += 1
+        except DebuggerStop as stop:
+            return str(stop)
+        return None
+
+    def step(self):
+        self.resuming = True
+        try:
+            self.emulator.step_instruction()
+        except DebuggerStop as stop:
+            return str(stop)
+        reason, self.pending_stop = self.pending_stop, None
+        return reason
+
+    def step_over(self):
+        instr = instructions.get(self.mmu.memory[self.cpu.PC])
+        if instr is None or not instr.name.startswith(('CALL', 'RST')):
+            return self.step()
+
+        self.temporary_breakpoints.add((self.cpu.PC + instr.length) & 0xFFFF)
+        self._update_hooks()
+        try:
+            return self.run()
+        finally:
+            self.temporary_breakpoints.clear()
+            self._update_hooks()
+
+    def finish(self):
+        # Para no RET/RETI que sai da rotina: a instrução executada é um retorno
+        # que desempilhou e deixou a pilha acima do frame atual (um POP não conta)
+        cpu = self.cpu
+        memory = self.mmu.memory
+        start_sp = cpu.SP
+
+        def returned(pc, sp):
+            return memory[pc & 0xFFFF] in RETURN_OPCODES and cpu.SP > sp and cpu.SP > start_sp
+
+        self.stop_condition = returned
+        self._update_hooks()
+        try:
+            return self.run()
+        finally:
+            self.stop_condition = None
+            self._update_hooks()
+
+    # --- inspeção ---
+
+    def registers(self):
+        cpu = self.cpu
+        values = {name: getattr(cpu, name) for name in REGISTERS}
+        flags = ''.join(f if cpu.F & bit else '-' for f, bit in zip('ZNHC', (0x80, 0x40, 0x20, 0x10)))
+        return (f"A={values['A']:02X} F={values['F']:02X} [{flags}] B={values['B']:02X} C={values['C']:02X} "
+                f"D={values['D']:02X} E={values['E']:02X} H={values['H']:02X} L={values['L']:02X} "
+                f"SP={values['SP']:04X} PC={values['PC']:04X} IME={int(values['ime'])}")
+
+    def memory_dump(self, address, length=64):
+        memory = self.mmu.memory
+        lines = []
+        for row in range(address, address + length, 16):
+            data = [memory[(row + i) & 0xFFFF] for i in range(min(16, address + length - row))]
+            text = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data)
+            lines.append(f"{row & 0xFFFF:04X}  {' '.join(f'{b:02X}' for b in data):47}  {text}")
+        return '\n'.join(lines)
+
+    def disassembly(self, address, count=10):
+        read_byte = self.mmu.memory.__getitem__
+        lines = []
+        for _ in range(count):
+            text, length = disassemble(read_byte, address)
+            raw = ' '.join(f'{read_byte((address + i) & 0xFFFF):02X}' for i in range(length))
+            marker = '>' if address == self.cpu.PC else ' '
+            lines.append(f'{marker} {address:04X}  {raw:9} {text}')
+            address = (address + length) & 0xFFFF
+        return '\n'.join(lines)
+
+
+def parse_address(text):
+    text = text.strip().lstrip('$')
+    if text.lower().startswith('0x'):
+        text = text[2:]
+    return int(text, 16)
+
+
+class DebuggerShell(cmd.Cmd):
+    intro = 'Debugger do Myu. Digite help ou ? para ver os comandos.'
+    prompt = '(myu) '
+
+    def __init__(self, debugger):
+        super().__init__()
+        self.debugger = debugger
+
+    def onecmd(self, line):
+        # cmd.Cmd não trata exceções: um argumento errado ou um Ctrl+C no meio de
+        # continue/next/finish derrubaria a sessão (e todos os breakpoints)
+        try:
+            return super().onecmd(line)
+        except (ValueError, IndexError) as error:
+            command = self.parseline(line)[0]
+            usage = getattr(getattr(self, f'do_{command}', None), '__doc__', None)
+            print(f'Argumento inválido: {error}' + (f'\nUso: {usage}' if usage else ''))
+        except KeyboardInterrupt:
+            self.show_stop('interrompido')
+
+    def show_stop(self, reason):
+        if reason:
+            print(f'Parou: {reason}')
+        print(self.debugger.registers())
+        print(self.debugger.disassembly(self.debugger.cpu.PC, 1))
+
+    def do_break(self, arg):
+        """break ADDR: breakpoint no endereço (hex). Sem argumento lista os breakpoints."""
+        if not arg:
+            print(' '.join(f'${a:04X}' for a in sorted(self.debugger.breakpoints)) or 'nenhum')
+            return
+        self.debugger.add_breakpoint(parse_address(arg))
+
+    def do_delete(self, arg):
+        """delete ADDR: remove o breakpoint."""
+        self.debugger.remove_breakpoint(parse_address(arg))
+
+    def do_watch(self, arg):
+        """watch ADDR [r|w|rw]: para quando o endereço for lido/escrito."""
+        parts = arg.split()
+        if not parts:
+            for address, mode in sorted(self.debugger.watchpoints.items()):
+                print(f'${address:04X} {mode}')
+            return
+        mode = parts[1] if len(parts) > 1 else 'rw'
+        self.debugger.add_watchpoint(parse_address(parts[0]), mode)
+
+    def do_unwatch(self, arg):
+        """unwatch ADDR: remove o watchpoint."""
+        self.debugger.remove_watchpoint(parse_address(arg))
+
+    def do_continue(self, arg):
+        """continue [FRAMES]: roda até um breakpoint/watchpoint (Ctrl+C interrompe)."""
+        self.show_stop(self.debugger.run(int(arg) if arg else None))
+
+    do_c = do_continue
+
+    def do_step(self, arg):
+        """step [N]: executa N instruções."""
+        reason = None
+        for _ in range(int(arg) if arg else 1):
+            reason = self.debugger.step()
+            if reason:
+                break
+        self.show_stop(reason)
+
+    do_s = do_step
+
+    def do_next(self, arg):
+        """next: executa a instrução, passando por cima de CALL/RST."""
+        self.show_stop(self.debugger.step_over())
+
+    do_n = do_next
+
+    def do_finish(self, arg):
+        """finish: roda até a rotina atual retornar."""
+        self.show_stop(self.debugger.finish())
+
+    def do_regs(self, arg):
+        """regs: mostra os registradores."""
+        print(self.debugger.registers())
+
+    def do_mem(self, arg):
+        """mem ADDR [LEN]: dump da memória."""
+        parts = arg.split()
+        length = int(parts[1], 0) if len(parts) > 1 else 64
+        print(self.debugger.memory_dump(parse_address(parts[0]), length))
+
+    def do_disas(self, arg):
+        """disas [ADDR] [N]: desmonta N instruções (padrão: a partir do PC)."""
+        parts = arg.split()
+        address = parse_address(parts[0]) if parts else self.debugger.cpu.PC
+        count = int(parts[1]) if len(parts) > 1 else 10
+        print(self.debugger.disassembly(address, count))
+
+    def do_quit(self, arg):
+        """quit: sai do debugger."""
+        return True
+
+    do_q = do_quit
+    do_EOF = do_quit
+
+
+def main():
+    from emulator import Emulator
+
+    parser = argparse.ArgumentParser(description='Debugger interativo (headless)')
+    parser.add_argument('--rom', default='roms/Tetris.gb')
+    args = parser.parse_args()
+
+    debugger = Debugger(Emulator(args.rom))
+    DebuggerShell(debugger).cmdloop()
+
+
+if __name__ == '__main__':
+    main()
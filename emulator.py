@@ -0,0 +1,147 @@
+import struct
+import zlib
+
+from mmu import MMU
+from cpu import CPU, REGISTERS
+from ppu import PPU
+
+CPU_HZ = 4194304
+CYCLES_PER_FRAME = 70224
+FRAME_RATE = CPU_HZ / CYCLES_PER_FRAME  # ~59.73 Hz
+
+# Versão do formato, registradores (A..L, SP, PC, ime), contador da PPU, DIV, frame,
+# instruções, botões, ciclos restantes da transferência serial
+STATE_VERSION = 2
+STATE_HEADER = struct.Struct('<B8B2H?HHIQBh')
+MEMORY_SIZE = 65536
+FRAMEBUFFER_SIZE = 160 * 144 * 3
+
+
+class Emulator:
+    """
+    Junta MMU, CPU e PPU e roda o loop de emulação sem depender do pygame
+    (screen=None => headless).
+    """
+
+    def __init__(self, rom_path=None, screen=None):
+        self.mmu = MMU()
+        if rom_path is not None:
+            self.mmu.load_rom(rom_path)
+
+        self.cpu = CPU(self.mmu)
+        self.ppu = PPU(self.mmu, screen)
+
+        self.div_counter = 0
+        self.frame_count = 0
+        self.instruction_count = 0
+        # link.LinkCable/PipeLink conectado; sem cabo a serial termina sozinha
+        self.link = None
+
+    def run_frame(self, input_cycle=None, on_input=None):
+        """
+        Roda um frame. Com on_input, o frame é dividido em dois e on_input() é
+        chamado depois de 'input_cycle' ciclos (ex: aplicar o joypad no meio do frame).
+        """
+        if on_input is None:
+            cycles = self.run_cycles(CYCLES_PER_FRAME)
+        else:
+            cycles = self.run_cycles(input_cycle)
+            on_input()
+            cycles += self.run_cycles(CYCLES_PER_FRAME - cycles)
+
+        self.frame_count += 1
+        return cycles
+
+    def run_cycles(self, target):
+        cpu = self.cpu
+        ppu = self.ppu
+        mmu = self.mmu
+        memory = mmu.memory
+        unlinked = self.link is None
+        div_counter = self.div_counter
+        instructions = 0
+
+        cycles_run = 0
+        # try/finally não custa nada no caminho normal e mantém o estado coerente
+        # se algo (ex: o debugger) interromper o frame com uma exceção
+        try:
+            while cycles_run < target:
+                cycles = cpu.step()
+                instructions += 1
+                cycles_run += cycles
+
+                ppu.step(cycles)
+
+                div_counter += cycles
+                if div_counter >= 256:
+                    div_counter -= 256
+                    memory[0xFF04] = (memory[0xFF04] + 1) & 0xFF
+
+                # Com cabo, quem termina a transferência é o link (na borda do quantum)
+                if mmu.serial_cycles > 0:
+                    mmu.serial_cycles -= cycles
+                    if mmu.serial_cycles <= 0 and unlinked:
+                        mmu.finish_serial()
+
+                if cycles == 0:
+                    cycles = 4
+                    cycles_run += 4
+                    ppu.step(4)
+        finally:
+            self.div_counter = div_counter
+            self.instruction_count += instructions
+
+        return cycles_run
+
+    def step_instruction(self):
+        # run_cycles(1) roda exatamente uma instrução, com a mesma contabilidade
+        return self.run_cycles(1)
+
+    def clone(self, screen=None):
+        """
+        Cria uma instância independente para explorar outros caminhos
+        (ex: busca em árvore de inputs). Copia os 64kb de memória (um memcpy)
+        e os registradores.
+        """
+        new = Emulator.__new__(Emulator)
+        new.mmu = self.mmu.clone()
+        new.cpu = self.cpu.clone(new.mmu)
+        new.ppu = self.ppu.clone(new.mmu, screen)
+        new.div_counter = self.div_counter
+        new.frame_count = self.frame_count
+        new.instruction_count = self.instruction_count
+        new.link = None
+        return new
+
+    def save_state(self):
+        """
+        Estado completo em bytes (registradores + memória + framebuffer), comprimido.
+        """
+        cpu = self.cpu
+        header = STATE_HEADER.pack(
+            STATE_VERSION, *(getattr(cpu, name) for name in REGISTERS),
+            self.ppu.counter, self.div_counter, self.frame_count,
+            self.instruction_count, self.mmu.buttons_mask(), self.mmu.serial_cycles,
+        )
+        return zlib.compress(header + bytes(self.mmu.memory) + bytes(self.ppu.buffer), 1)
+
+    def load_state(self, state):
+        data = zlib.decompress(state)
+        # O tamanho também confere: estados antigos não têm o byte de versão
+        if (len(data) != STATE_HEADER.size + MEMORY_SIZE + FRAMEBUFFER_SIZE
+                or data[0] != STATE_VERSION):
+            raise ValueError('save state de uma versão incompatível do emulador')
+        values = STATE_HEADER.unpack_from(data)[1:]
+
+        for name, value in zip(REGISTERS, values):
+            setattr(self.cpu, name, value)
+        (self.ppu.counter, self.div_counter, self.frame_count,
+         self.instruction_count, buttons, self.mmu.serial_cycles) = values[len(REGISTERS):]
+
+        # Direto no dicionário: restaurar estado não deve disparar a interrupção do joypad
+        for i, btn in enumerate(self.mmu.buttons):
+            self.mmu.buttons[btn] = bool(buttons & (1 << i))
+
+        offset = STATE_HEADER.size
+        self.mmu.memory[:] = data[offset:offset + MEMORY_SIZE]
+        self.ppu.buffer[:] = data[offset + MEMORY_SIZE:]
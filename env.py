@@ -0,0 +1,107 @@
+from numbers import Integral
+
+from emulator import Emulator
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem numpy as observações viram memoryview/bytes
+    np = None
+
+SCREEN_WIDTH = 160
+SCREEN_HEIGHT = 144
+
+# Ações discretas padrão (índice => botões segurados)
+ACTIONS = [
+    (),
+    ('a',), ('b',), ('start',), ('select',),
+    ('up',), ('down',), ('left',), ('right',),
+    ('a', 'left'), ('a', 'right'), ('b', 'left'), ('b', 'right'),
+]
+
+
+class GameBoyEnv:
+    """
+    Ambiente para aprendizado por reforço, sem pygame.
+
+    obs_type: 'rgb' (view do framebuffer) ou 'gray' (paleta já é cinza, usamos 1 canal)
+    downsample: fator de redução da imagem (1 = tamanho original)
+    ram_features: {nome: endereço} lidos a cada passo e devolvidos em info['ram']
+    reward_fn / done_fn: funções (emulator) -> valor
+    """
+
+    def __init__(self, rom_path, frame_skip=4, obs_type='rgb', downsample=1,
+                 ram_features=None, reward_fn=None, done_fn=None):
+        if obs_type not in ('rgb', 'gray'):
+            raise ValueError(f"obs_type inválido: {obs_type}")
+
+        self.frame_skip = frame_skip
+        self.obs_type = obs_type
+        self.downsample = downsample
+        self.ram_features = dict(ram_features or {})
+        self.reward_fn = reward_fn
+        self.done_fn = done_fn
+
+        self.initial = Emulator(rom_path)
+        self.emulator = None
+        self.view = None
+
+    def reset(self):
+        self.emulator = self.initial.clone()
+        # O clone tem um buffer novo, então a view precisa ser refeita
+        if np is not None:
+            self.view = np.frombuffer(self.emulator.ppu.buffer, dtype=np.uint8).reshape(
+                SCREEN_HEIGHT, SCREEN_WIDTH, 3)
+        else:
+            self.view = memoryview(self.emulator.ppu.buffer)
+        return self.observe()
+
+    def step(self, action, frames=None):
+        """
+        Segura 'action' (índice de ACTIONS ou botões) por 'frames' frames
+        (padrão frame_skip) e devolve (obs, reward, done, info).
+        """
+        if self.emulator is None:
+            raise RuntimeError("Chame reset() antes de step()")
+
+        # Integral cobre também os inteiros do numpy (argmax, Discrete.sample())
+        if isinstance(action, Integral):
+            action = ACTIONS[action]
+        self.emulator.mmu.set_buttons(action)
+
+        for _ in range(frames if frames is not None else self.frame_skip):
+            self.emulator.run_frame()
+
+        reward = self.reward_fn(self.emulator) if self.reward_fn else 0
+        done = bool(self.done_fn(self.emulator)) if self.done_fn else False
+        info = {'ram': self.ram(), 'frame': self.emulator.frame_count}
+        return self.observe(), reward, done, info
+
+    def observe(self):
+        """
+        Com numpy: rgb/gray/downsample são views do framebuffer (zero cópia),
+        válidas até o próximo step. Sem numpy: memoryview (rgb) ou bytes (gray),
+        sempre recortados por slicing em C.
+        """
+        n = self.downsample
+
+        if np is not None:
+            view = self.view[::n, ::n] if n > 1 else self.view
+            return view[:, :, 0] if self.obs_type == 'gray' else view
+
+        if self.obs_type == 'rgb':
+            if n > 1:
+                raise ValueError("downsample de rgb requer numpy")
+            return self.view
+
+        gray = self.view[0::3]
+        if n == 1:
+            return gray.tobytes()
+        return b''.join(
+            gray[y * SCREEN_WIDTH:(y + 1) * SCREEN_WIDTH:n].tobytes()
+            for y in range(0, SCREEN_HEIGHT, n)
+        )
+
+    def ram(self):
+        memory = self.emulator.mmu.memory
+        return {name: memory[address] for name, address in self.ram_features.items()}
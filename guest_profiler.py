@@ -0,0 +1,175 @@
+import argparse
+import bisect
+from collections import Counter
+
+import hooks
+
+INTERRUPT_NAMES = {
+    0x0040: 'int_vblank', 0x0048: 'int_stat', 0x0050: 'int_timer',
+    0x0058: 'int_serial', 0x0060: 'int_joypad',
+}
+
+
+def load_symbols(path):
+    """
+    Lê um arquivo .sym (formato RGBDS/BGB: 'BB:AAAA Nome', ';' comenta).
+    Sem MBC só existem os bancos 0 e 1, então os outros são ignorados.
+    """
+    symbols = {}
+    with open(path) as file:
+        for line in file:
+            line = line.split(';', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                location, name = line.split(None, 1)
+                bank, address = location.split(':')
+                bank, address = int(bank, 16), int(address, 16)
+            except ValueError:
+                continue
+            if bank <= 1:
+                symbols[address] = name.strip()
+    return symbols
+
+
+class GuestProfiler:
+    """
+    Profiler por amostragem do código do jogo (não do host).
+
+    Mantém uma pilha de chamadas "sombra" a partir de CALL/RST/RET/RETI e das
+    interrupções, e a cada 'interval' ciclos registra a pilha atual + PC.
+    Os wrappers são atributos da instância, igual ao profiling.Instrumentation.
+    """
+
+    def __init__(self, cpu, interval=1000, symbols=None):
+        self.cpu = cpu
+        self.interval = interval
+        self.symbols = symbols or {}
+        self.symbol_addresses = sorted(self.symbols)
+        self.enabled = False
+
+        self.samples = Counter()
+        self.stack = []  # (endereço da função, SP logo após empilhar o retorno)
+
+    def enable(self):
+        if self.enabled:
+            return
+        cpu = self.cpu
+        stack = self.stack
+        samples = self.samples
+        interval = self.interval
+
+        def pop_returned():
+            # Desempilha tudo que ficou acima do SP (cobre jogos que mexem na pilha na mão)
+            sp = cpu.SP
+            while stack and stack[-1][1] < sp:
+                stack.pop()
+
+        def make_call(op_call):
+            def call(inst, parts):
+                sp = cpu.SP
+                op_call(inst, parts)
+                if cpu.SP != sp:
+                    stack.append((cpu.PC, cpu.SP))
+            return call
+
+        def make_rst(op_rst):
+            def rst(inst, parts):
+                op_rst(inst, parts)
+                stack.append((cpu.PC, cpu.SP))
+            return rst
+
+        def make_ret(op_ret):
+            def ret(inst, parts):
+                op_ret(inst, parts)
+                pop_returned()
+            return ret
+
+        def make_interrupt(service_interrupt):
+            def interrupt(bit_n, vector):
+                service_interrupt(bit_n, vector)
+                stack.append((vector, cpu.SP))
+            return interrupt
+
+        countdown = [interval]
+
+        def make_sampled_step(step):
+            def sampled_step():
+                cycles = step()
+                countdown[0] -= cycles
+                if countdown[0] <= 0:
+                    countdown[0] += interval
+                    samples[(tuple(address for address, _ in stack), cpu.PC)] += 1
+                return cycles
+            return sampled_step
+
+        hooks.install(self, cpu, 'step', make_sampled_step)
+        hooks.install(self, cpu, 'op_CALL', make_call)
+        hooks.install(self, cpu, 'op_RST', make_rst)
+        hooks.install(self, cpu, 'op_RET', make_ret)
+        hooks.install(self, cpu, 'op_RETI', make_ret)
+        hooks.install(self, cpu, 'service_interrupt', make_interrupt)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        hooks.remove(self)
+        self.enabled = False
+
+    def function_name(self, address):
+        if address in self.symbols:
+            return self.symbols[address]
+        if address in INTERRUPT_NAMES:
+            return INTERRUPT_NAMES[address]
+        return f'sub_{address:04X}'
+
+    def location_name(self, address):
+        # PC dentro de uma rotina: símbolo mais próximo abaixo dele
+        index = bisect.bisect_right(self.symbol_addresses, address) - 1
+        if index >= 0:
+            base = self.symbol_addresses[index]
+            name = self.symbols[base]
+            return name if base == address else f'{name}+0x{address - base:X}'
+        return f'pc_{address:04X}'
+
+    def folded(self):
+        """Linhas 'f1;f2;pc N', prontas para flamegraph.pl / speedscope / inferno."""
+        folded = Counter()
+        for (stack, pc), count in self.samples.items():
+            frames = [self.function_name(address) for address in stack]
+            frames.append(self.location_name(pc))
+            folded[';'.join(['main'] + frames)] += count
+        return [f'{line} {count}' for line, count in sorted(folded.items())]
+
+    def write_folded(self, path):
+        with open(path, 'w') as file:
+            file.write('\n'.join(self.folded()) + '\n')
+
+
+def main():
+    from emulator import Emulator
+
+    parser = argparse.ArgumentParser(description='Profiler por amostragem do código guest (saída folded)')
+    parser.add_argument('--rom', default='roms/Tetris.gb')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--interval', type=int, default=1000, help='ciclos entre amostras')
+    parser.add_argument('--sym', help='arquivo .sym com os nomes das rotinas')
+    parser.add_argument('--out', default='guest.folded')
+    args = parser.parse_args()
+
+    symbols = load_symbols(args.sym) if args.sym else None
+
+    emulator = Emulator(args.rom)
+    profiler = GuestProfiler(emulator.cpu, args.interval, symbols)
+    profiler.enable()
+    for _ in range(args.frames):
+        emulator.run_frame()
+    profiler.disable()
+
+    profiler.write_folded(args.out)
+    print(f'{sum(profiler.samples.values())} amostras salvas em {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import weakref
+
+_MISSING = object()
+
+# objeto => {atributo: [valor original na instância, [(dono, fábrica), ...]]}
+_chains = weakref.WeakKeyDictionary()
+
+
+def install(owner, obj, name, factory):
+    """
+    Instala um wrapper como atributo da instância: factory(atual) => wrapper.
+
+    As ferramentas (profiling, guest_profiler, tracer, debugger, metrics) empilham
+    wrappers nos mesmos métodos. Guardando as fábricas, remove() de qualquer uma
+    refaz a cadeia das outras em vez de apagar o que elas instalaram por cima ou
+    por baixo, em qualquer ordem.
+    """
+    chains = _chains.setdefault(obj, {})
+    if name not in chains:
+        chains[name] = [obj.__dict__.get(name, _MISSING), []]
+    chains[name][1].append((owner, factory))
+    setattr(obj, name, factory(getattr(obj, name)))
+    _changed(obj, name)
+
+
+def remove(owner):
+    """Remove todos os wrappers de 'owner', mantendo os dos outros."""
+    for obj, chains in list(_chains.items()):
+        for name, (original, layers) in list(chains.items()):
+            if not any(layer_owner is owner for layer_owner, _ in layers):
+                continue
+            layers[:] = [(o, f) for o, f in layers if o is not owner]
+
+            if original is _MISSING:
+                obj.__dict__.pop(name, None)
+            else:
+                setattr(obj, name, original)
+            for _, factory in layers:
+                setattr(obj, name, factory(getattr(obj, name)))
+
+            if not layers:
+                del chains[name]
+            _changed(obj, name)
+        if not chains:
+            del _chains[obj]
+
+
+def _changed(obj, name):
+    # A CPU guarda os op_* ligados na tabela de dispatch
+    if name.startswith('op_') and hasattr(obj, 'rebuild_dispatch'):
+        obj.rebuild_dispatch()
@@ -146,4 +146,76 @@ instructions = {
     0x3F: Instruction('CCF', 1, 4),
 
     
-}
\ No newline at end of file
+}
+
+
+def decode(instr):
+    """
+    (nome do handler na CPU, partes do nome) de uma instrução, ex:
+    'LD_A_(HL)' => ('op_LD', ['LD', 'A', '(HL)']).
+    """
+    parts = instr.name.split('_')
+    if instr.name == 'LD_HL_SP+r8':
+        return 'op_LD_HL_SP', parts
+    return f'op_{parts[0]}', parts
+
+
+# Decodificado uma vez por processo; a CPU só liga os handlers (ver CPU.rebuild_dispatch)
+decoded = [None] * 256
+for opcode, instr in instructions.items():
+    decoded[opcode] = (instr,) + decode(instr)
+
+
+# Nomes dos opcodes do prefixo CB (decodificados em cpu.op_PREFIX pelos bits)
+CB_REGISTERS = ['B', 'C', 'D', 'E', 'H', 'L', '(HL)', 'A']
+CB_ROTATIONS = ['RLC', 'RRC', 'RL', 'RR', 'SLA', 'SRA', 'SWAP', 'SRL']
+
+def cb_instruction_name(cb_opcode):
+    reg = CB_REGISTERS[cb_opcode & 0x07]
+    bit = (cb_opcode >> 3) & 0x07
+    operation = (cb_opcode >> 6) & 0x03
+
+    if operation == 0:
+        return f'{CB_ROTATIONS[bit]}_{reg}'
+    return f"{('BIT', 'RES', 'SET')[operation - 1]}_{bit}_{reg}"
+
+
+def disassemble(read_byte, address):
+    """
+    Devolve (texto, tamanho) da instrução em 'address', trocando d8/a8/r8/d16/a16
+    pelos valores lidos da memória.
+    """
+    opcode = read_byte(address)
+
+    if opcode == 0xCB:
+        return cb_instruction_name(read_byte((address + 1) & 0xFFFF)).replace('_', ' ', 1).replace('_', ','), 2
+
+    instr = instructions.get(opcode)
+    if instr is None:
+        return f'DB ${opcode:02X}', 1
+
+    length = instr.length
+    imm8 = read_byte((address + 1) & 0xFFFF)
+    imm16 = imm8 | (read_byte((address + 2) & 0xFFFF) << 8)
+
+    mnemonic = instr.name.split('_')[0]
+    if mnemonic == 'PREFIX':
+        return 'PREFIX CB', length
+
+    operands = []
+    for part in instr.name.split('_')[1:]:
+        if 'd16' in part or 'a16' in part:
+            part = part.replace('d16', f'${imm16:04X}').replace('a16', f'${imm16:04X}')
+        elif 'a8' in part:
+            part = part.replace('a8', f'$FF{imm8:02X}')
+        elif 'd8' in part:
+            part = part.replace('d8', f'${imm8:02X}')
+        elif part == 'r8' and mnemonic == 'JR':
+            offset = imm8 - 256 if imm8 > 127 else imm8
+            part = f'${(address + length + offset) & 0xFFFF:04X}'
+        elif 'r8' in part:
+            offset = imm8 - 256 if imm8 > 127 else imm8
+            part = part.replace('+r8', f'{offset:+d}').replace('r8', f'{offset:+d}')
+        operands.append(part)
+
+    return (f'{mnemonic} {",".join(operands)}' if operands else mnemonic), length
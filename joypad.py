@@ -0,0 +1,100 @@
+import time
+from collections import deque
+
+# Onde os eventos do teclado são aplicados:
+#   'frame' - na borda do frame (determinístico, usado ao gravar movies)
+#   'cycle' - depois de apply_cycle ciclos dentro do frame
+#   'read'  - logo antes da primeira leitura do joypad (0xFF00) pelo jogo em cada frame
+INPUT_MODES = ('frame', 'cycle', 'read')
+
+
+class JoypadInput:
+    """
+    Fila de eventos do joypad com timestamp, sem cooldown artificial.
+
+    Um toque rápido (press + release antes do jogo ver o botão) não se perde:
+    o release fica para a próxima aplicação, então o jogo sempre vê o botão
+    pressionado por pelo menos uma leitura. Vale o mesmo para release + press
+    de um botão segurado: o press espera, senão o IF do joypad subiria sem a
+    máscara mudar e um movie gravado não reproduziria igual.
+    """
+
+    def __init__(self, mmu, mode='frame', apply_cycle=0):
+        if mode not in INPUT_MODES:
+            raise ValueError(f'modo de input inválido: {mode}')
+        self.mmu = mmu
+        self.mode = mode
+        self.apply_cycle = apply_cycle
+        self.queue = deque()
+
+        # Latência (segundos) entre o evento chegar e ser aplicado
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+        mmu.input_hook = self.apply_on_read if mode == 'read' else None
+
+    def push(self, button, pressed, timestamp=None):
+        self.queue.append((time.perf_counter() if timestamp is None else timestamp, button, pressed))
+
+    def push_pygame_events(self, events, key_map, pygame):
+        now = time.perf_counter()
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key in key_map:
+                self.push(key_map[event.key], True, now)
+            elif event.type == pygame.KEYUP and event.key in key_map:
+                self.push(key_map[event.key], False, now)
+
+    def apply(self):
+        if not self.queue:
+            return
+
+        now = time.perf_counter()
+        pressed_now = set()
+        released_now = set()
+        deferred = deque()
+        mmu = self.mmu
+
+        while self.queue:
+            event = self.queue.popleft()
+            timestamp, button, pressed = event
+
+            # Depois de adiar um evento do botão, os seguintes também esperam (mantém a ordem)
+            if any(b == button for _, b, _ in deferred):
+                deferred.append(event)
+                continue
+
+            # Cada transição do botão precisa aparecer numa aplicação diferente
+            if button in (released_now if pressed else pressed_now):
+                deferred.append(event)
+                continue
+
+            if pressed:
+                mmu.press_button(button)
+                pressed_now.add(button)
+            else:
+                mmu.release_button(button)
+                released_now.add(button)
+
+            latency = now - timestamp
+            self.last_latency = latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+        self.queue = deferred
+
+    def apply_on_read(self):
+        # Uma vez por frame: o jogo lê FF00 várias vezes por poll (linha do
+        # direcional e depois a dos botões). Aplicando a cada leitura, um toque
+        # rápido seria solto antes da linha dos botões ser lida
+        self.mmu.input_hook = None
+        self.apply()
+
+    def run_frame(self, emulator):
+        """Roda um frame aplicando o input no ponto configurado."""
+        if self.mode == 'read':
+            self.mmu.input_hook = self.apply_on_read
+        elif self.mode == 'cycle':
+            return emulator.run_frame(self.apply_cycle, self.apply)
+        if self.mode == 'frame':
+            self.apply()
+        return emulator.run_frame()
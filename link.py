@@ -0,0 +1,250 @@
+import argparse
+import multiprocessing as mp
+import time
+
+from emulator import Emulator, CYCLES_PER_FRAME, FRAME_RATE
+from mmu import SERIAL_TRANSFER_CYCLES
+
+SCREEN_WIDTH = 160
+SCREEN_HEIGHT = 144
+
+# Jogador 2 no lado esquerdo do teclado (nomes das constantes do pygame)
+PLAYER_2_KEY_NAMES = {
+    'K_TAB': 'start',
+    'K_LSHIFT': 'select',
+    'K_g': 'a',
+    'K_f': 'b',
+    'K_w': 'up',
+    'K_s': 'down',
+    'K_a': 'left',
+    'K_d': 'right',
+}
+
+
+def serial_status(mmu):
+    """(transferência com clock interno terminou, esperando clock externo, byte em SB)"""
+    control = mmu.memory[0xFF02]
+    due = (control & 0x81) == 0x81 and mmu.serial_cycles <= 0
+    waiting = (control & 0x81) == 0x80
+    return due, waiting, mmu.memory[0xFF01]
+
+
+def apply_transfer(mmu, local, peer):
+    """
+    Resolve a borda de transferência de um lado do cabo. local e peer são os
+    serial_status() tirados antes de qualquer lado aplicar nada.
+    """
+    due, waiting, _ = local
+    peer_due, peer_waiting, peer_byte = peer
+
+    if due:
+        # O outro lado só devolve o próprio byte se estiver pronto para transferir
+        mmu.finish_serial(peer_byte if peer_due or peer_waiting else 0xFF)
+        return True
+    if waiting and peer_due:
+        mmu.finish_serial(peer_byte)
+        return True
+    return False
+
+
+def horizon(mmu, lead, remaining):
+    """
+    Quantos ciclos dá para rodar sem passar de nenhuma borda de transferência.
+    Uma transferência nova termina no mínimo SERIAL_TRANSFER_CYCLES depois de
+    começar, então esse é o maior quantum seguro mesmo sem nada pendente.
+    """
+    limit = min(remaining, SERIAL_TRANSFER_CYCLES)
+    if mmu.serial_cycles > 0:
+        limit = min(limit, lead + mmu.serial_cycles)
+    return limit
+
+
+def advance(emulator, lead, quantum):
+    # lead = ciclos que o emulador já rodou além do tempo do cabo (a última
+    # instrução de um quantum passa um pouco do alvo)
+    if lead >= quantum:
+        return lead - quantum
+    return lead + emulator.run_cycles(quantum - lead) - quantum
+
+
+class LinkCable:
+    """
+    Cabo link entre dois emuladores no mesmo processo.
+
+    Os dois rodam em quanta que terminam exatamente nas bordas de transferência
+    (no máximo SERIAL_TRANSFER_CYCLES cada), e só ali os bytes são trocados:
+    não há sincronização por instrução, então dois emuladores custam pouco mais
+    que o dobro de um.
+    """
+
+    def __init__(self, left, right):
+        self.emulators = (left, right)
+        self.leads = [0, 0]
+        self.transfers = 0
+        left.link = self
+        right.link = self
+
+    def run_cycles(self, target):
+        left, right = self.emulators
+        done = 0
+
+        while done < target:
+            left_status = serial_status(left.mmu)
+            right_status = serial_status(right.mmu)
+            if apply_transfer(left.mmu, left_status, right_status):
+                self.transfers += 1
+            if apply_transfer(right.mmu, right_status, left_status):
+                self.transfers += 1
+
+            remaining = target - done
+            quantum = min(horizon(left.mmu, self.leads[0], remaining),
+                          horizon(right.mmu, self.leads[1], remaining))
+
+            self.leads[0] = advance(left, self.leads[0], quantum)
+            self.leads[1] = advance(right, self.leads[1], quantum)
+            done += quantum
+
+        return done
+
+    def run_frame(self):
+        cycles = self.run_cycles(CYCLES_PER_FRAME)
+        for emulator in self.emulators:
+            emulator.frame_count += 1
+        return cycles
+
+    def disconnect(self):
+        for emulator in self.emulators:
+            emulator.link = None
+
+
+class PipeLink:
+    """
+    Um lado do cabo link, com o outro emulador em outro processo.
+
+    Mesmo esquema do LinkCable: a cada quantum os dois lados trocam uma mensagem
+    pequena (status da serial + horizonte) pelo Pipe. Os dois processos precisam
+    chamar run_cycles/run_frame com os mesmos alvos.
+    """
+
+    def __init__(self, emulator, connection):
+        self.emulator = emulator
+        self.connection = connection
+        self.lead = 0
+        self.transfers = 0
+        emulator.link = self
+
+    def run_cycles(self, target):
+        emulator = self.emulator
+        mmu = emulator.mmu
+        connection = self.connection
+        done = 0
+
+        while done < target:
+            status = serial_status(mmu)
+            limit = horizon(mmu, self.lead, target - done)
+            connection.send((status, limit))
+            peer_status, peer_limit = connection.recv()
+
+            if apply_transfer(mmu, status, peer_status):
+                self.transfers += 1
+
+            quantum = min(limit, peer_limit)
+            self.lead = advance(emulator, self.lead, quantum)
+            done += quantum
+
+        return done
+
+    def run_frame(self):
+        cycles = self.run_cycles(CYCLES_PER_FRAME)
+        self.emulator.frame_count += 1
+        return cycles
+
+    def disconnect(self):
+        self.emulator.link = None
+
+
+def _peer(connection, rom_path, frames):
+    link = PipeLink(Emulator(rom_path), connection)
+    for _ in range(frames):
+        link.run_frame()
+    connection.send(link.transfers)
+
+
+def run(rom_path, other_rom, frames, pipe):
+    start = time.perf_counter()
+
+    if pipe:
+        parent_conn, child_conn = mp.Pipe()
+        process = mp.Process(target=_peer, args=(child_conn, other_rom, frames), daemon=True)
+        process.start()
+
+        link = PipeLink(Emulator(rom_path), parent_conn)
+        for _ in range(frames):
+            link.run_frame()
+        transfers = link.transfers + parent_conn.recv()
+        process.join()
+    else:
+        link = LinkCable(Emulator(rom_path), Emulator(other_rom))
+        for _ in range(frames):
+            link.run_frame()
+        transfers = link.transfers
+
+    elapsed = time.perf_counter() - start
+    print(f"{frames} frames em {elapsed:.2f}s ({frames / elapsed / FRAME_RATE * 100:.1f}% tempo real), "
+          f"{transfers} bytes transferidos")
+
+
+def play(rom_path, other_rom):
+    import pygame
+    from main import load_key_map
+    from pacing import FramePacer
+
+    key_map = load_key_map(pygame)
+    key_map_2 = load_key_map(pygame, PLAYER_2_KEY_NAMES)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH * 4, SCREEN_HEIGHT * 2))
+    pygame.display.set_caption('Emulador Myu - link')
+
+    # Cada PPU desenha na sua metade da janela
+    left = Emulator(rom_path, screen.subsurface((SCREEN_WIDTH * 2, 0, SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2)))
+    right = Emulator(other_rom, screen.subsurface((0, 0, SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2)))
+    link = LinkCable(left, right)
+    pacer = FramePacer()
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                for emulator, keys in ((left, key_map), (right, key_map_2)):
+                    if event.key in keys:
+                        if event.type == pygame.KEYDOWN:
+                            emulator.mmu.press_button(keys[event.key])
+                        else:
+                            emulator.mmu.release_button(keys[event.key])
+
+        link.run_frame()
+        pygame.display.flip()
+        pacer.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cabo link entre duas instâncias do emulador')
+    parser.add_argument('mode', choices=['run', 'play'])
+    parser.add_argument('--rom', default='roms/Tetris.gb')
+    parser.add_argument('--rom2', help='ROM do segundo Game Boy (padrão: a mesma)')
+    parser.add_argument('--frames', type=int, default=600, help="frames rodados no modo 'run'")
+    parser.add_argument('--pipe', action='store_true', help='segundo emulador em outro processo')
+    args = parser.parse_args()
+
+    other_rom = args.rom2 or args.rom
+    if args.mode == 'run':
+        run(args.rom, other_rom, args.frames, args.pipe)
+    else:
+        play(args.rom, other_rom)
+
+
+if __name__ == '__main__':
+    main()
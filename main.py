@@ -1,88 +1,189 @@
-import pygame
+import argparse
+import shlex
 import sys
-from mmu import MMU
-from cpu import CPU
-from ppu import PPU
+import time
+from capture import FrameCapture
+from emulator import Emulator
+from joypad import JoypadInput, INPUT_MODES
+from metrics import LiveStats, Overlay, stream_sink, udp_sink
+from movie import MovieRecorder
+from pacing import FramePacer
+from rewind import Rewind
 
 SCREEN_WIDTH = 160
 SCREEN_HEIGHT = 144
-CYCLES_PER_FRAME = 70224 
 
 ROM_PATH = 'roms/Tetris.gb'
 
-key_map = {
-    pygame.K_RETURN: 'start',
-    pygame.K_RSHIFT: 'select',
-    pygame.K_z: 'a',
-    pygame.K_x: 'b',
-    pygame.K_UP: 'up',
-    pygame.K_DOWN: 'down',
-    pygame.K_LEFT: 'left',
-    pygame.K_RIGHT: 'right'
+# Nomes das constantes do pygame: o pygame (e o SDL) só é importado quando a
+# janela abre, então importar este módulo não custa nada para as ferramentas headless
+KEY_NAMES = {
+    'K_RETURN': 'start',
+    'K_RSHIFT': 'select',
+    'K_z': 'a',
+    'K_x': 'b',
+    'K_UP': 'up',
+    'K_DOWN': 'down',
+    'K_LEFT': 'left',
+    'K_RIGHT': 'right'
 }
 
+# Segurar essa tecla volta no tempo
+REWIND_KEY = 'K_BACKSPACE'
+# Liga/desliga o overlay de estatísticas
+STATS_KEY = 'K_F3'
+
+
+def load_key_map(pygame, names=KEY_NAMES):
+    return {getattr(pygame, name): btn for name, btn in names.items()}
+
+
+# Folga ao emular "tarde" no frame (--late), para não perder o deadline
+LATE_MARGIN = 0.002
+
 def main(): 
+    parser = argparse.ArgumentParser(description='Emulador Myu')
+    parser.add_argument('--rom', default=ROM_PATH)
+    parser.add_argument('--record', help='grava os inputs num movie (ver movie.py)')
+    parser.add_argument('--input-mode', choices=INPUT_MODES, default='frame',
+                        help='quando aplicar o input dentro do frame (ver joypad.py)')
+    parser.add_argument('--input-cycle', type=int, default=0,
+                        help="ciclo do frame em que o input é aplicado no modo 'cycle'")
+    parser.add_argument('--late', action='store_true',
+                        help='emula no fim do frame, perto do deadline do display (menos latência)')
+    parser.add_argument('--vsync', action='store_true', help='sincroniza pelo vsync do display')
+    parser.add_argument('--capture', help='grava os frames como sequência de PNG neste diretório')
+    parser.add_argument('--stats', action='store_true', help='começa com o overlay de estatísticas (F3)')
+    parser.add_argument('--stats-json', action='store_true',
+                        help='escreve as estatísticas como uma linha JSON por segundo no stderr')
+    parser.add_argument('--stats-udp', type=int, metavar='PORT',
+                        help='envia as estatísticas em JSON por UDP para 127.0.0.1:PORT')
+    parser.add_argument('--capture-pipe',
+                        help='grava os frames RGB crus no stdin deste comando (ex: ffmpeg ... -i -)')
+    args = parser.parse_args()
+
+    # Movies só são determinísticos com o input aplicado na borda do frame
+    if args.record:
+        args.input_mode = 'frame'
+
+    import pygame
+    key_map = load_key_map(pygame)
+    rewind_key = getattr(pygame, REWIND_KEY)
+    stats_key = getattr(pygame, STATS_KEY)
+
     pygame.init()
-    
-    memory_unit = MMU()
-    memory_unit.load_rom(ROM_PATH)
 
     # Configuração da Janela (2x escala)
-    screen = pygame.display.set_mode((SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2))
+    if args.vsync:
+        screen = pygame.display.set_mode((SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2), pygame.SCALED, vsync=1)
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2))
     pygame.display.set_caption("Emulador Myu - Tetris")
-    
-    cpu = CPU(memory_unit)
-    ppu = PPU(memory_unit, screen)
 
-    clock = pygame.time.Clock()
+    emulator = Emulator(args.rom, screen)
+    memory_unit = emulator.mmu
+    ppu = emulator.ppu
+    rewind = Rewind(emulator.cpu, memory_unit, ppu)
+    # Gravando, o rewind fica desligado para o movie continuar determinístico
+    recorder = MovieRecorder(emulator) if args.record else None
+    joypad = JoypadInput(memory_unit, args.input_mode, args.input_cycle)
+
+    capture = None
+    if args.capture_pipe:
+        capture = FrameCapture(None, 'pipe', shlex.split(args.capture_pipe))
+    elif args.capture:
+        capture = FrameCapture(args.capture)
+
+    pacer = FramePacer(mode='vsync' if args.vsync else 'clock')
+
+    sinks = []
+    if args.stats_json:
+        sinks.append(stream_sink())
+    if args.stats_udp:
+        sinks.append(udp_sink(port=args.stats_udp))
+    live_stats = LiveStats(emulator, pacer, sinks=sinks)
+    live_stats.enable()
+    show_stats = args.stats
+    overlay = None
+
     running = True
 
-    div_counter = 0
-    
-    btn_cooldowns = {k: 0 for k in key_map.values()}
+    # Modo --late: média móvel do tempo de emulação
+    emulation_time = 0.0
 
     while running:
 
-        for btn in btn_cooldowns:
-            if btn_cooldowns[btn] > 0:
-                btn_cooldowns[btn] -=1
-
-        for event in pygame.event.get():
+        if not pacer.frame_due():
+            # Vblank antes da hora do próximo frame (monitor de 120/144 Hz): só
+            # reapresenta a tela; os eventos ficam na fila para o próximo frame
+            pygame.event.pump()
+            pygame.display.flip()
+            live_stats.mark('present')
+            continue
+
+        if args.late:
+            # Dorme até sobrar só o tempo de emular, então lê o input o mais tarde possível
+            pacer.sleep_until(pacer.next_deadline - emulation_time - LATE_MARGIN)
+            live_stats.mark('sleep')
+
+        events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key in key_map:
-                    btn = key_map[event.key]
-                    if btn_cooldowns[btn] == 0:
-                        memory_unit.press_button(btn) 
-                        btn_cooldowns[btn] = 15
-
-            if event.type == pygame.KEYUP:
-                if event.key in key_map:
-                    btn = key_map[event.key]
-                    memory_unit.release_button(btn)
-
-        cycles_this_frame = 0
-        while cycles_this_frame < CYCLES_PER_FRAME:
-            cycles = cpu.step()
-            cycles_this_frame += cycles
-
-            ppu.step(cycles)
-            
-            div_counter += cycles
-            if div_counter >= 256: 
-                div_counter -= 256
-                current_div = memory_unit.memory[0xFF04]
-                memory_unit.memory[0xFF04] = (current_div + 1) & 0xFF
-      
-            if cycles == 0:
-                cycles = 4
-                cycles_this_frame += 4
-                ppu.step(4)
-
-        pygame.display.flip()
-        clock.tick(60) # Mantém 60 FPS estáveis
+            elif event.type == pygame.KEYDOWN and event.key == stats_key:
+                show_stats = not show_stats
+        joypad.push_pygame_events(events, key_map, pygame)
+        live_stats.mark('input')
+
+        emulation_start = time.perf_counter()
+        rewinding = recorder is None and pygame.key.get_pressed()[rewind_key]
+
+        if rewinding:
+            rewind.step_back()
+            ppu.render_screen()
+        elif recorder is not None:
+            joypad.apply()
+            recorder.run_frame()
+        else:
+            joypad.run_frame(emulator)
+            rewind.on_frame()
+        live_stats.mark('cpu')
+
+        if capture is not None:
+            capture.capture(ppu.buffer)
+
+        if show_stats:
+            if overlay is None:
+                overlay = Overlay()
+            overlay.draw(screen, live_stats.snapshot)
+
+        if args.late and not rewinding:
+            emulation_time = 0.9 * emulation_time + 0.1 * (time.perf_counter() - emulation_start)
+            pacer.wait()
+            live_stats.mark('sleep')
+            pygame.display.flip()
+            live_stats.mark('present')
+        else:
+            pygame.display.flip()
+            live_stats.mark('present')
+            pacer.wait() # ~59.73 FPS, a taxa real do Game Boy
+            live_stats.mark('sleep')
+
+        live_stats.end_frame()
+
+    if recorder is not None:
+        recorder.save(args.record)
+
+    if capture is not None:
+        capture.close()
+        stats = capture.stats()
+        print(f"Captura: {stats['written_frames']} frames gravados, {stats['dropped_frames']} descartados")
+        if stats['error']:
+            print(f"Captura interrompida por erro: {stats['error']}")
+
+    stats = pacer.stats()
+    print(f"Frames: {stats['frames']}, atrasados: {stats['late_frames']}, perdidos: {stats['dropped_frames']}, "
+          f"reapresentados: {stats['repeated_frames']}, jitter: {stats['jitter_ms']:.2f} ms")
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,174 @@
+import json
+import socket
+import sys
+import time
+
+import hooks
+from emulator import FRAME_RATE
+
+PHASES = ('input', 'cpu', 'ppu', 'present', 'sleep')
+# Bits de IE/IF, na ordem de prioridade
+INTERRUPT_NAMES = ('vblank', 'lcd_stat', 'timer', 'serial', 'joypad')
+
+
+class LiveStats:
+    """
+    Estatísticas ao vivo do loop principal, medidas só com checkpoints por frame.
+
+    O frontend chama mark(fase) depois de cada etapa (o tempo desde o último
+    mark vai para aquela fase) e end_frame() uma vez por frame. O tempo de PPU
+    vem de um wrapper em render_screen (uma vez por frame) e é descontado da
+    fase 'cpu'; as interrupções são contadas num wrapper de service_interrupt.
+    Nada roda por instrução.
+
+    A cada 'interval' segundos end_frame() devolve um snapshot e o entrega aos sinks.
+    """
+
+    def __init__(self, emulator, pacer=None, interval=1.0, sinks=()):
+        self.emulator = emulator
+        self.pacer = pacer
+        self.interval = interval
+        self.sinks = list(sinks)
+        self.enabled = False
+        self.snapshot = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        perf_counter = time.perf_counter
+
+        def make_timed_render(render_screen):
+            def timed_render():
+                start = perf_counter()
+                render_screen()
+                self.render_time += perf_counter() - start
+            return timed_render
+
+        def make_counted_interrupt(service_interrupt):
+            def counted_interrupt(bit_n, vector):
+                self.interrupts[bit_n] += 1
+                service_interrupt(bit_n, vector)
+            return counted_interrupt
+
+        hooks.install(self, self.emulator.ppu, 'render_screen', make_timed_render)
+        hooks.install(self, self.emulator.cpu, 'service_interrupt', make_counted_interrupt)
+        self.reset()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        hooks.remove(self)
+        self.enabled = False
+
+    def reset(self):
+        now = time.perf_counter()
+        self.window_start = now
+        self.last_mark = now
+        self.frames = 0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.render_time = 0.0
+        self.interrupts = [0] * len(INTERRUPT_NAMES)
+        self.start_instructions = self.emulator.instruction_count
+        self.start_frames = self.emulator.frame_count
+        self.start_dropped = self.pacer.dropped_frames if self.pacer else 0
+        self.start_late = self.pacer.late_frames if self.pacer else 0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phase_time[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        self.frames += 1
+        now = time.perf_counter()
+        if now - self.window_start < self.interval:
+            return None
+
+        snapshot = self.take_snapshot(now)
+        self.reset()
+        for sink in self.sinks:
+            sink(snapshot)
+        return snapshot
+
+    def take_snapshot(self, now):
+        elapsed = now - self.window_start
+        frames = max(self.frames, 1)
+        emulated = self.emulator.frame_count - self.start_frames
+
+        # render_screen roda dentro do frame emulado: sai da conta da CPU
+        ms = {phase: total / frames * 1000 for phase, total in self.phase_time.items()}
+        ms['ppu'] += self.render_time / frames * 1000
+        ms['cpu'] = max(ms['cpu'] - self.render_time / frames * 1000, 0.0)
+
+        pacer = self.pacer
+        self.snapshot = {
+            'time': time.time(),
+            'speed_pct': emulated / elapsed / FRAME_RATE * 100,
+            'fps': self.frames / elapsed,
+            'instructions_per_second': (self.emulator.instruction_count - self.start_instructions) / elapsed,
+            'ms_per_frame': {phase: round(value, 3) for phase, value in ms.items()},
+            'interrupts_per_second': {
+                name: count / elapsed for name, count in zip(INTERRUPT_NAMES, self.interrupts)
+            },
+            'dropped_frames': (pacer.dropped_frames - self.start_dropped) if pacer else 0,
+            'late_frames': (pacer.late_frames - self.start_late) if pacer else 0,
+        }
+        return self.snapshot
+
+
+def stream_sink(stream=sys.stderr):
+    """Uma linha JSON por snapshot (padrão: stderr)."""
+    def sink(snapshot):
+        stream.write(json.dumps(snapshot) + '\n')
+        stream.flush()
+    return sink
+
+
+def udp_sink(host='127.0.0.1', port=9999):
+    """
+    Datagrama UDP por snapshot: nunca bloqueia o loop, mesmo sem ninguém ouvindo.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+
+    def sink(snapshot):
+        try:
+            sock.sendto(json.dumps(snapshot).encode(), (host, port))
+        except OSError:
+            pass
+    return sink
+
+
+def format_lines(snapshot):
+    ms = snapshot['ms_per_frame']
+    interrupts = snapshot['interrupts_per_second']
+    return [
+        f"{snapshot['speed_pct']:5.1f}%  {snapshot['fps']:5.1f} fps",
+        f"{snapshot['instructions_per_second'] / 1e6:.2f} M instr/s",
+        f"entrada {ms['input']:.1f}  cpu {ms['cpu']:.1f}  ppu {ms['ppu']:.1f} ms",
+        f"tela {ms['present']:.1f}  sono {ms['sleep']:.1f} ms",
+        f"int/s vbl {interrupts['vblank']:.0f} lcd {interrupts['lcd_stat']:.0f} "
+        f"tim {interrupts['timer']:.0f}",
+        f"perdidos {snapshot['dropped_frames']}  atrasados {snapshot['late_frames']}",
+    ]
+
+
+class Overlay:
+    """Texto das estatísticas por cima da tela do pygame."""
+
+    def __init__(self, size=14):
+        import pygame
+        pygame.font.init()
+        self.pygame = pygame
+        self.font = pygame.font.Font(None, size)
+        self.line_height = self.font.get_linesize()
+
+    def draw(self, screen, snapshot):
+        if snapshot is None:
+            return
+        lines = format_lines(snapshot)
+        width = max(self.font.size(line)[0] for line in lines) + 6
+        screen.fill((0, 0, 0), (0, 0, width, self.line_height * len(lines) + 4))
+        for i, line in enumerate(lines):
+            screen.blit(self.font.render(line, True, (255, 255, 0)), (3, 2 + i * self.line_height))
@@ -1,23 +1,27 @@
 from utils import _print
 
+# Ordem dos botões (é a ordem dos bits em buttons_mask)
+BUTTONS = ('a', 'b', 'up', 'down', 'left', 'right', 'start', 'select')
+
+# Transferência serial com clock interno: 8 bits a 8192 Hz
+SERIAL_TRANSFER_CYCLES = 4096
+
 class MMU():
     def __init__(self):
 
         self.memory = bytearray(65536)
-        _print("MMU inicializada com 64kb")
-        self.buttons = {
-            'a': False,
-            'b': False,
-            'up': False,
-            'down': False,
-            'left': False,
-            'right': False,
-            'start': False,
-            'select': False,
-        }
+        # Bytes enviados pela porta serial (test ROMs escrevem o resultado aqui)
+        self.serial_output = bytearray()
+        # Ciclos até a transferência serial atual terminar (contados pelo Emulator)
+        self.serial_cycles = 0
+        # Chamado antes de cada leitura do joypad (0xFF00), ver joypad.JoypadInput
+        self.input_hook = None
+        self.buttons = {btn: False for btn in BUTTONS}
 
     def read_byte(self, address):
         if address == 0xFF00:
+            if self.input_hook is not None:
+                self.input_hook()
             joypad_register = self.memory[0xFF00]
             
             result = 0xCF
@@ -68,6 +72,14 @@ class MMU():
             self.memory[address] = (value & 0x30) | 0x0F 
             return
 
+        # Serial: bits 7 e 0 ligados iniciam uma transferência com clock interno,
+        # que termina SERIAL_TRANSFER_CYCLES depois (ver Emulator.run_cycles e link.py).
+        # Só o bit 7 => esperando o clock do outro lado do cabo
+        if address == 0xFF02:
+            self.memory[address] = value & 0xFF
+            self.serial_cycles = SERIAL_TRANSFER_CYCLES if (value & 0x81) == 0x81 else 0
+            return
+
         self.memory[address] = value & 0xFF
 
     def load_rom(self, rom_path):
@@ -89,6 +101,27 @@ class MMU():
         except Exception as e:
             _print(f'ERROR: Ocorreu um erro ao carregar a rom: {e}')
 
+    def finish_serial(self, received=0xFF):
+        """
+        Fim da transferência: guarda o byte enviado, recebe o do outro lado
+        (0xFF sem cabo) e pede a interrupção serial.
+        """
+        self.serial_output.append(self.memory[0xFF01])
+        self.memory[0xFF01] = received
+        self.memory[0xFF02] &= 0x7F
+        self.memory[0xFF0F] |= 0x08
+        self.serial_cycles = 0
+
+    def clone(self):
+        new = MMU.__new__(MMU)
+        # bytearray(bytearray) é um memcpy dos 64kb (ROM inclusa), bem mais barato que deepcopy
+        new.memory = bytearray(self.memory)
+        new.buttons = dict(self.buttons)
+        new.serial_output = bytearray(self.serial_output)
+        new.serial_cycles = self.serial_cycles
+        new.input_hook = None
+        return new
+
     def press_button(self, btn): 
         if not self.buttons[btn]:
             self.buttons[btn] = True
@@ -97,4 +130,23 @@ class MMU():
             self.memory[0xFF0F] = if_reg | 0x10
 
     def release_button(self, btn):
-        self.buttons[btn] = False
\ No newline at end of file
+        self.buttons[btn] = False
+
+    def set_buttons(self, pressed):
+        # Deixa pressionados só os botões em 'pressed' (útil para bots/replays)
+        for btn in self.buttons:
+            if btn in pressed:
+                self.press_button(btn)
+            else:
+                self.release_button(btn)
+
+    def buttons_mask(self):
+        # Um bit por botão, na ordem de self.buttons (usado em save states e movies)
+        mask = 0
+        for i, btn in enumerate(self.buttons):
+            if self.buttons[btn]:
+                mask |= 1 << i
+        return mask
+
+    def set_buttons_mask(self, mask):
+        self.set_buttons([btn for i, btn in enumerate(self.buttons) if mask & (1 << i)])
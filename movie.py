@@ -0,0 +1,153 @@
+import argparse
+import struct
+import zlib
+from array import array
+
+from emulator import Emulator
+
+MAGIC = b'MYUMOVIE'
+# 2: save state com byte de versão e ciclos da transferência serial
+VERSION = 2
+
+# magic, versão, frames, tamanho do estado inicial, número de faixas de RAM
+HEADER = struct.Struct('<8sHIIB')
+RAM_RANGE = struct.Struct('<HI')  # início, fim (exclusivo)
+
+# RAM que entra no hash de cada frame, além do framebuffer: WRAM, IF e HRAM
+# (as faixas vão no arquivo, então movies antigos continuam verificando as suas)
+DEFAULT_RAM_RANGES = ((0xC000, 0xE000), (0xFF0F, 0xFF10), (0xFF80, 0xFFFF))
+
+
+def frame_hash(emulator, ram_ranges):
+    # crc32 roda em C e é suficiente para detectar divergência
+    value = zlib.crc32(emulator.ppu.buffer)
+    memory = emulator.mmu.memory
+    for start, end in ram_ranges:
+        value = zlib.crc32(memory[start:end], value)
+    return value
+
+
+class Movie:
+    """
+    Estado inicial + estado do joypad de cada frame (1 byte) + hash de cada frame.
+    """
+
+    def __init__(self, start_state, ram_ranges=DEFAULT_RAM_RANGES):
+        self.start_state = start_state
+        self.ram_ranges = tuple(ram_ranges)
+        self.inputs = bytearray()
+        self.hashes = array('I')
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(self.inputs),
+                                   len(self.start_state), len(self.ram_ranges)))
+            for start, end in self.ram_ranges:
+                file.write(RAM_RANGE.pack(start, end))
+            file.write(self.start_state)
+            file.write(self.inputs)
+            self.hashes.tofile(file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            magic, version, frames, state_size, range_count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f'{path} não é um movie válido')
+            if version != VERSION:
+                raise ValueError(f'{path} é um movie da versão {version} (esperada {VERSION})')
+
+            ram_ranges = [RAM_RANGE.unpack(file.read(RAM_RANGE.size)) for _ in range(range_count)]
+            movie = cls(file.read(state_size), ram_ranges)
+            movie.inputs = bytearray(file.read(frames))
+            movie.hashes.fromfile(file, frames)
+        return movie
+
+
+class MovieRecorder:
+    """
+    Grava um movie a partir do estado atual do emulador. Use run_frame() no lugar
+    de emulator.run_frame(): o input é amostrado na borda do frame, que é onde o
+    loop principal aplica os eventos do teclado.
+    """
+
+    def __init__(self, emulator, ram_ranges=DEFAULT_RAM_RANGES):
+        self.emulator = emulator
+        self.movie = Movie(emulator.save_state(), ram_ranges)
+
+    def run_frame(self):
+        emulator = self.emulator
+        self.movie.inputs.append(emulator.mmu.buttons_mask())
+        cycles = emulator.run_frame()
+        self.movie.hashes.append(frame_hash(emulator, self.movie.ram_ranges))
+        return cycles
+
+    def save(self, path):
+        self.movie.save(path)
+
+
+def replay(movie, verify=True):
+    """
+    Reproduz o movie headless. Retorna (emulador, primeiro frame divergente ou None).
+    """
+    emulator = Emulator()
+    emulator.load_state(movie.start_state)
+    mmu = emulator.mmu
+    ram_ranges = movie.ram_ranges
+
+    previous = None
+    for frame, mask in enumerate(movie.inputs):
+        if mask != previous:
+            mmu.set_buttons_mask(mask)
+            previous = mask
+        emulator.run_frame()
+
+        if verify and frame_hash(emulator, ram_ranges) != movie.hashes[frame]:
+            return emulator, frame
+
+    return emulator, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gravação e replay determinístico de inputs')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='grava um movie headless a partir de um script de input')
+    record.add_argument('out')
+    record.add_argument('--rom', default='roms/Tetris.gb')
+    record.add_argument('--inputs', help="script de input (formato do bench.py)")
+    record.add_argument('--frames', type=int, default=600)
+
+    play = sub.add_parser('replay', help='reproduz e verifica os hashes de cada frame')
+    play.add_argument('path')
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from bench import load_inputs
+
+        inputs = load_inputs(args.inputs) if args.inputs else {}
+        emulator = Emulator(args.rom)
+        recorder = MovieRecorder(emulator)
+        for frame in range(args.frames):
+            if frame in inputs:
+                emulator.mmu.set_buttons(inputs[frame])
+            recorder.run_frame()
+        recorder.save(args.out)
+        print(f'{args.frames} frames gravados em {args.out}')
+        return
+
+    movie = Movie.load(args.path)
+    _, diverged = replay(movie)
+    if diverged is None:
+        print(f'OK: {len(movie)} frames idênticos')
+    else:
+        print(f'DIVERGIU no frame {diverged} (de {len(movie)})')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
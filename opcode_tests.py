@@ -0,0 +1,177 @@
+import argparse
+import glob
+import json
+import os
+from collections import Counter
+from multiprocessing import Pool
+
+from mmu import MMU
+from cpu import CPU
+
+# Campos de registrador no formato dos vetores (SingleStepTests sm83) => atributo da CPU
+REGISTER_FIELDS = {
+    'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'e': 'E', 'f': 'F', 'h': 'H', 'l': 'L',
+    'pc': 'PC', 'sp': 'SP',
+}
+
+ZERO_MEMORY = bytes(65536)
+
+
+class TestBus:
+    """
+    Barramento plano de 64kb como o usado para gerar os vetores: sem proteção de
+    ROM nem registradores de IO, e registra cada acesso para comparar com 'cycles'.
+    Fica como atributo da instância da MMU, então a CPU não muda nada.
+    """
+
+    def __init__(self, mmu):
+        self.memory = mmu.memory
+        self.accesses = []
+        mmu.read_byte = self.read_byte
+        mmu.write_byte = self.write_byte
+
+    def read_byte(self, address):
+        value = self.memory[address & 0xFFFF]
+        self.accesses.append((address & 0xFFFF, value, 'r'))
+        return value
+
+    def write_byte(self, address, value):
+        self.memory[address & 0xFFFF] = value & 0xFF
+        self.accesses.append((address & 0xFFFF, value & 0xFF, 'w'))
+
+
+def new_cpu():
+    # Construtores normais: montam a tabela de dispatch da CPU (e não imprimem nada)
+    mmu = MMU()
+    cpu = CPU(mmu)
+    # Cada vetor é só a instrução: sem checagem de interrupção antes dela, senão as
+    # leituras de IE/IF entram em bus.accesses e um IE & IF do estado inicial desviaria
+    # para o vetor da interrupção no lugar de executar o opcode
+    cpu.handle_interrupts = lambda: None
+    return cpu, mmu, TestBus(mmu)
+
+
+def load_state(cpu, memory, state):
+    memory[:] = ZERO_MEMORY
+    for field, attr in REGISTER_FIELDS.items():
+        setattr(cpu, attr, state[field])
+    cpu.ime = bool(state.get('ime', 0))
+    if 'ie' in state:
+        memory[0xFFFF] = state['ie']
+    for address, value in state['ram']:
+        memory[address] = value
+
+
+def compare(cpu, memory, bus, cycles, case):
+    """Lista de (campo, esperado, obtido) que não bateram."""
+    final = case['final']
+    diffs = []
+
+    for field, attr in REGISTER_FIELDS.items():
+        value = getattr(cpu, attr)
+        if value != final[field]:
+            diffs.append((field, final[field], value))
+
+    if 'ime' in final and int(bool(cpu.ime)) != final['ime']:
+        diffs.append(('ime', final['ime'], int(bool(cpu.ime))))
+
+    for address, value in final['ram']:
+        if memory[address] != value:
+            diffs.append((f'ram[{address:04X}]', value, memory[address]))
+
+    # Cada ciclo é [endereço, valor, 'r-m' | '-wm' | '---'] (ou null nos ciclos internos)
+    expected_accesses = [
+        (address, value, 'w' if kind[1] == 'w' else 'r')
+        for address, value, kind in (c for c in case['cycles'] if c)
+        if value is not None and (kind[0] == 'r' or kind[1] == 'w')
+    ]
+    if bus.accesses != expected_accesses:
+        diffs.append(('bus', expected_accesses, bus.accesses))
+
+    if cycles != len(case['cycles']) * 4:
+        diffs.append(('cycles', len(case['cycles']) * 4, cycles))
+
+    return diffs
+
+
+def run_file(job):
+    path, limit = job
+    with open(path) as file:
+        cases = json.load(file)
+    if limit:
+        cases = cases[:limit]
+
+    cpu, mmu, bus = new_cpu()
+    memory = mmu.memory
+    field_failures = Counter()
+    failed = 0
+    first_failure = None
+
+    for case in cases:
+        load_state(cpu, memory, case['initial'])
+        bus.accesses.clear()
+        try:
+            cycles = cpu.step()
+            diffs = compare(cpu, memory, bus, cycles, case)
+        except Exception as error:
+            diffs = [('exception', None, repr(error))]
+
+        if diffs:
+            failed += 1
+            for field, _, _ in diffs:
+                field_failures['ram' if field.startswith('ram[') else field] += 1
+            if first_failure is None:
+                first_failure = {'name': case['name'], 'diffs': [list(map(str, d)) for d in diffs]}
+
+    return {
+        'file': os.path.basename(path),
+        'cases': len(cases),
+        'failed': failed,
+        'fields': dict(field_failures),
+        'first_failure': first_failure,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compara a CPU com vetores JSON por opcode (formato SingleStepTests sm83)')
+    parser.add_argument('path', help='pasta com os arquivos <opcode>.json')
+    parser.add_argument('--opcodes', nargs='*', help="ex: 00 3e 'cb 47' (padrão: todos)")
+    parser.add_argument('--limit', type=int, help='máximo de casos por arquivo')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='mostra a primeira falha de cada opcode')
+    parser.add_argument('--json', help='salva o relatório neste arquivo')
+    args = parser.parse_args()
+
+    if args.opcodes:
+        files = [os.path.join(args.path, f'{op.lower()}.json') for op in args.opcodes]
+    else:
+        files = sorted(glob.glob(os.path.join(args.path, '*.json')))
+
+    with Pool(args.workers) as pool:
+        results = pool.map(run_file, [(f, args.limit) for f in files], chunksize=1)
+
+    total_failed = 0
+    for result in results:
+        total_failed += result['failed']
+        status = 'ok' if result['failed'] == 0 else 'FALHOU'
+        fields = ', '.join(f'{k}={v}' for k, v in sorted(result['fields'].items()))
+        print(f"{result['file']:12} {status:7} {result['failed']:6}/{result['cases']:<6} {fields}")
+        if args.verbose and result['first_failure']:
+            print(f"    {result['first_failure']['name']}")
+            for field, expected, got in result['first_failure']['diffs']:
+                print(f'      {field}: esperado {expected}, obtido {got}')
+
+    passed = sum(1 for r in results if r['failed'] == 0)
+    print(f'\n{passed}/{len(results)} opcodes sem divergência, {total_failed} casos falharam')
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if total_failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
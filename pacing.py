@@ -0,0 +1,134 @@
+import statistics
+import time
+from collections import deque
+
+from emulator import FRAME_RATE
+
+SYNC_MODES = ('clock', 'vsync', 'audio')
+
+
+class FramePacer:
+    """
+    Ritmo de frames na taxa real do Game Boy (~59.73 Hz).
+
+    'clock': dorme até perto do deadline e termina com espera ativa (spin), já que
+             time.sleep pode acordar alguns ms atrasado.
+    'vsync': o flip do display já bloqueia; o frontend pergunta frame_due() a cada
+             vblank e só emula quando o próximo frame venceu (em 120/144 Hz os
+             outros vblanks só reapresentam a tela).
+    'audio': como 'clock', mas o período é ajustado pelo nível do buffer de áudio
+             (audio_fill() => 0.0 a 1.0), para o áudio nunca esvaziar nem estourar.
+    """
+
+    def __init__(self, fps=FRAME_RATE, mode='clock', spin=0.002,
+                 audio_fill=None, audio_target=0.5, audio_gain=0.05):
+        if mode not in SYNC_MODES:
+            raise ValueError(f'modo de sincronização inválido: {mode}')
+        if mode == 'audio' and audio_fill is None:
+            raise ValueError("modo 'audio' precisa de audio_fill")
+
+        self.period = 1.0 / fps
+        self.mode = mode
+        self.spin = spin
+        self.audio_fill = audio_fill
+        self.audio_target = audio_target
+        self.audio_gain = audio_gain
+
+        self.next_deadline = time.perf_counter() + self.period
+        self.last_frame = None
+        self.intervals = deque(maxlen=600)
+
+        # Modo vsync: vblank em que o frame foi liberado e menor intervalo entre vblanks
+        self.due_at = None
+        self.last_vblank = None
+        self.refresh_period = None
+
+        self.frames = 0
+        self.repeated_frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+
+    def sleep_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.perf_counter() < deadline:
+            pass
+
+    def frame_period(self):
+        if self.mode != 'audio':
+            return self.period
+        # Buffer mais cheio que o alvo => frames um pouco mais longos (e vice-versa)
+        return self.period * (1.0 + self.audio_gain * (self.audio_fill() - self.audio_target))
+
+    def frame_due(self):
+        """
+        Se já é hora de emular o próximo frame. Só o modo vsync pode dizer que não:
+        chamado logo depois de cada flip, devolve False nos vblanks que chegam antes
+        do deadline e o frontend só reapresenta a tela anterior.
+        """
+        if self.mode != 'vsync':
+            return True
+
+        now = time.perf_counter()
+        if self.last_vblank is not None:
+            # O menor intervalo é o período do monitor (os maiores tiveram frame atrasado)
+            interval = now - self.last_vblank
+            if self.refresh_period is None or interval < self.refresh_period:
+                self.refresh_period = interval
+        self.last_vblank = now
+
+        if now < self.next_deadline:
+            self.repeated_frames += 1
+            return False
+        self.due_at = now
+        return True
+
+    def wait(self):
+        """Espera até o fim do frame atual e agenda o próximo."""
+        deadline = self.next_deadline
+
+        if self.mode == 'vsync':
+            # O flip já bloqueou e frame_due() segurou o frame até o deadline: mede a
+            # partir do vblank que o liberou. Até um período do monitor depois do
+            # deadline é o normal (o deadline cai entre dois vblanks)
+            now = self.due_at if self.due_at is not None else time.perf_counter()
+            self.due_at = None
+            refresh = self.refresh_period if self.refresh_period is not None else self.period
+            if now - deadline > refresh + self.spin:
+                self.late_frames += 1
+        else:
+            now = time.perf_counter()
+            if now < deadline:
+                self.sleep_until(deadline)
+                now = time.perf_counter()
+            elif now - deadline > self.spin:
+                self.late_frames += 1
+
+        period = self.frame_period()
+        behind = now - deadline
+        if behind > period:
+            # Atrasou mais de um frame inteiro: conta os perdidos e ressincroniza
+            self.dropped_frames += int(behind / period)
+            self.next_deadline = now + period
+        else:
+            self.next_deadline = deadline + period
+
+        if self.last_frame is not None:
+            self.intervals.append(now - self.last_frame)
+        self.last_frame = now
+        self.frames += 1
+
+    def stats(self):
+        intervals = self.intervals
+        mean = statistics.fmean(intervals) if intervals else 0.0
+        return {
+            'frames': self.frames,
+            'repeated_frames': self.repeated_frames,
+            'late_frames': self.late_frames,
+            'dropped_frames': self.dropped_frames,
+            'target_ms': self.period * 1000,
+            'mean_ms': mean * 1000,
+            'jitter_ms': statistics.pstdev(intervals) * 1000 if len(intervals) > 1 else 0.0,
+            'max_ms': max(intervals) * 1000 if intervals else 0.0,
+        }
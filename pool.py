@@ -0,0 +1,127 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from emulator import Emulator
+
+FRAME_SIZE = 160 * 144 * 3
+
+
+def _worker(conn, rom_path, shm_name, offset, ram_addresses):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_view = shm.buf[offset:offset + FRAME_SIZE]
+    ram_view = shm.buf[offset + FRAME_SIZE:offset + FRAME_SIZE + len(ram_addresses)]
+
+    initial = Emulator(rom_path)
+    emulator = initial.clone()
+
+    try:
+        while True:
+            command, args = conn.recv()
+
+            if command == 'step':
+                action, frames = args
+                # action = botões segurados neste passo (None mantém o estado atual)
+                if action is not None:
+                    emulator.mmu.set_buttons(action)
+                for _ in range(frames):
+                    emulator.run_frame()
+
+            elif command == 'reset':
+                emulator = initial.clone()
+
+            elif command == 'close':
+                break
+
+            # Escreve a observação direto na memória compartilhada (sem pickle do frame)
+            frame_view[:] = emulator.ppu.buffer
+            memory = emulator.mmu.memory
+            for i, address in enumerate(ram_addresses):
+                ram_view[i] = memory[address]
+
+            conn.send(emulator.frame_count)
+    finally:
+        frame_view.release()
+        ram_view.release()
+        shm.close()
+
+
+class EmulatorPool:
+    """
+    N emuladores, um por processo, para fugir do GIL.
+
+    Cada worker escreve o framebuffer e os bytes de RAM escolhidos num bloco de
+    shared_memory; step() só troca mensagens pequenas pelo Pipe e devolve
+    memoryviews para esse bloco.
+    """
+
+    def __init__(self, rom_path, workers=None, ram_addresses=()):
+        self.workers = workers or os.cpu_count() or 1
+        self.ram_addresses = tuple(ram_addresses)
+        self.stride = FRAME_SIZE + len(self.ram_addresses)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.stride * self.workers)
+        self.frames = []
+        self.rams = []
+        self.connections = []
+        self.processes = []
+
+        for i in range(self.workers):
+            offset = i * self.stride
+            self.frames.append(self.shm.buf[offset:offset + FRAME_SIZE])
+            self.rams.append(self.shm.buf[offset + FRAME_SIZE:offset + self.stride])
+
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(
+                target=_worker,
+                args=(child_conn, rom_path, self.shm.name, offset, self.ram_addresses),
+                daemon=True,
+            )
+            process.start()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+    def _broadcast(self, messages):
+        for conn, message in zip(self.connections, messages):
+            conn.send(message)
+        return [conn.recv() for conn in self.connections]
+
+    def step(self, actions, frames=1):
+        """
+        actions: um item por worker (conjunto de botões segurados ou None).
+        Retorna (frames, rams), listas de memoryviews para a memória compartilhada;
+        elas são sobrescritas no próximo step/reset.
+        """
+        if len(actions) != self.workers:
+            raise ValueError(f"Esperado {self.workers} ações, recebido {len(actions)}")
+
+        self._broadcast([('step', (action, frames)) for action in actions])
+        return self.frames, self.rams
+
+    def reset(self):
+        self._broadcast([('reset', None)] * self.workers)
+        return self.frames, self.rams
+
+    def close(self):
+        if self.shm is None:
+            return
+
+        for conn in self.connections:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+
+        for view in self.frames + self.rams:
+            view.release()
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,5 +1,4 @@
 from mmu import MMU
-import pygame
 
 COLORS = [
     (255, 255, 255), (192, 192, 192), (96, 96, 96), (0, 0, 0)
@@ -12,7 +11,15 @@ class PPU:
         self.counter = 0
         # Buffer de bytes RGB (Muito rápido)
         self.buffer = bytearray(160 * 144 * 3)
-        print("PPU (Buffer Mode) inicializada")
+
+    def clone(self, mmu, screen=None):
+        # Clones são headless por padrão (sem referência à janela do pygame)
+        new = PPU.__new__(PPU)
+        new.mmu = mmu
+        new.screen = screen
+        new.counter = self.counter
+        new.buffer = bytearray(self.buffer)
+        return new
 
     def step(self, cycles):
         self.counter += cycles
@@ -83,6 +90,12 @@ class PPU:
                 self.buffer[idx+2] = b
                 idx += 3
 
+        # Sem janela (modo headless) o buffer já é o resultado final
+        if self.screen is None: return
+
+        # Importado só aqui: o núcleo (e os workers headless) não carregam o pygame/SDL
+        import pygame
+
         # Cria a imagem e escala (Blit corrige o formato)
         image = pygame.image.frombuffer(self.buffer, (160, 144), 'RGB')
         scaled_image = pygame.transform.scale(image, (320, 288))
@@ -0,0 +1,210 @@
+import argparse
+import json
+import time
+from collections import Counter
+
+import hooks
+from instruction_set import instructions, cb_instruction_name
+
+# (nome, primeiro endereço) de cada região do mapa de memória
+MEMORY_REGIONS = [
+    ('rom', 0x0000), ('vram', 0x8000), ('eram', 0xA000), ('wram', 0xC000),
+    ('echo', 0xE000), ('oam', 0xFE00), ('unusable', 0xFEA0), ('io', 0xFF00),
+    ('hram', 0xFF80), ('ie', 0xFFFF),
+]
+
+# Métodos da CPU cujo tempo de host é medido (além de todos os op_*)
+CPU_HELPERS = ['get_operand_value', 'set_operand_value', 'handle_interrupts',
+               'service_interrupt', 'alu_add', 'add_16_bit', 'check_condition',
+               'update_logic_flags']
+
+
+def build_region_table():
+    table = bytearray(65536)
+    for index, (_, start) in enumerate(MEMORY_REGIONS):
+        end = MEMORY_REGIONS[index + 1][1] if index + 1 < len(MEMORY_REGIONS) else 0x10000
+        table[start:end] = bytes([index]) * (end - start)
+    return bytes(table)
+
+
+class Instrumentation:
+    """
+    Modo instrumentado opcional da CPU/MMU.
+
+    Nada é checado no caminho normal: enable() coloca wrappers como atributos da
+    instância (que têm prioridade sobre os métodos da classe) e disable() os remove,
+    voltando ao dispatch original sem custo nenhum.
+    """
+
+    def __init__(self, cpu, mmu=None):
+        self.cpu = cpu
+        self.mmu = mmu if mmu is not None else cpu.mmu
+        self.enabled = False
+        self.region_table = build_region_table()
+        self.reset()
+
+    def reset(self):
+        self.opcode_counts = [0] * 256
+        self.cb_counts = [0] * 256
+        self.handler_calls = Counter()
+        self.handler_time = Counter()
+        self.region_reads = [0] * len(MEMORY_REGIONS)
+        self.region_writes = [0] * len(MEMORY_REGIONS)
+
+    def handler_names(self):
+        names = [name for name in dir(type(self.cpu)) if name.startswith('op_')]
+        return names + CPU_HELPERS
+
+    def enable(self):
+        if self.enabled:
+            return
+        cpu = self.cpu
+        memory = self.mmu.memory
+
+        for name in self.handler_names():
+            hooks.install(self, cpu, name, lambda method, name=name: self._timed(name, method))
+
+        # handle_interrupts roda logo antes do fetch em CPU.step, então o PC
+        # aqui já é o da instrução que vai executar
+        opcode_counts = self.opcode_counts
+        cb_counts = self.cb_counts
+
+        def make_counted_interrupts(timed_interrupts):
+            def handle_interrupts():
+                timed_interrupts()
+                pc = cpu.PC & 0xFFFF
+                opcode = memory[pc]
+                opcode_counts[opcode] += 1
+                if opcode == 0xCB:
+                    cb_counts[memory[(pc + 1) & 0xFFFF]] += 1
+            return handle_interrupts
+
+        hooks.install(self, cpu, 'handle_interrupts', make_counted_interrupts)
+
+        self._wrap_mmu()
+        self.enabled = True
+
+    def _timed(self, name, method):
+        calls = self.handler_calls
+        total = self.handler_time
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                total[name] += perf_counter() - start
+                calls[name] += 1
+
+        return wrapper
+
+    def _wrap_mmu(self):
+        regions = self.region_table
+        reads = self.region_reads
+        writes = self.region_writes
+
+        def make_counted_read(read_byte):
+            def counted_read(address):
+                reads[regions[address & 0xFFFF]] += 1
+                return read_byte(address)
+            return counted_read
+
+        def make_counted_write(write_byte):
+            def counted_write(address, value):
+                writes[regions[address & 0xFFFF]] += 1
+                return write_byte(address, value)
+            return counted_write
+
+        hooks.install(self, self.mmu, 'read_byte', make_counted_read)
+        hooks.install(self, self.mmu, 'write_byte', make_counted_write)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        hooks.remove(self)
+        self.enabled = False
+
+    def results(self):
+        def opcode_name(opcode):
+            instr = instructions.get(opcode)
+            return instr.name if instr else 'UNKNOWN'
+
+        return {
+            'opcodes': {
+                f'0x{op:02X}': {'name': opcode_name(op), 'count': count}
+                for op, count in enumerate(self.opcode_counts) if count
+            },
+            'cb_opcodes': {
+                f'0x{op:02X}': {'name': cb_instruction_name(op), 'count': count}
+                for op, count in enumerate(self.cb_counts) if count
+            },
+            'handlers': {
+                name: {'calls': self.handler_calls[name],
+                       'seconds': self.handler_time[name],
+                       'ns_per_call': self.handler_time[name] / self.handler_calls[name] * 1e9}
+                for name in self.handler_calls
+            },
+            'memory': {
+                name: {'reads': self.region_reads[i], 'writes': self.region_writes[i]}
+                for i, (name, _) in enumerate(MEMORY_REGIONS)
+            },
+        }
+
+    def to_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.results(), file, indent=2)
+
+    def table(self, limit=20):
+        results = self.results()
+        lines = []
+
+        lines.append(f"{'opcode':8} {'nome':16} {'execuções':>12}")
+        ops = sorted(results['opcodes'].items(), key=lambda item: -item[1]['count'])
+        for op, data in ops[:limit]:
+            lines.append(f"{op:8} {data['name']:16} {data['count']:12}")
+
+        if results['cb_opcodes']:
+            lines.append('')
+            lines.append(f"{'CB':8} {'nome':16} {'execuções':>12}")
+            cbs = sorted(results['cb_opcodes'].items(), key=lambda item: -item[1]['count'])
+            for op, data in cbs[:limit]:
+                lines.append(f"{op:8} {data['name']:16} {data['count']:12}")
+
+        lines.append('')
+        lines.append(f"{'handler':24} {'chamadas':>10} {'total (s)':>10} {'ns/chamada':>11}")
+        handlers = sorted(results['handlers'].items(), key=lambda item: -item[1]['seconds'])
+        for name, data in handlers[:limit]:
+            lines.append(f"{name:24} {data['calls']:10} {data['seconds']:10.3f} {data['ns_per_call']:11.0f}")
+
+        lines.append('')
+        lines.append(f"{'região':10} {'leituras':>12} {'escritas':>12}")
+        for name, data in results['memory'].items():
+            lines.append(f"{name:10} {data['reads']:12} {data['writes']:12}")
+
+        return '\n'.join(lines)
+
+
+def main():
+    from emulator import Emulator
+
+    parser = argparse.ArgumentParser(description='Roda a ROM headless com contadores por opcode')
+    parser.add_argument('--rom', default='roms/Tetris.gb')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--json', help='salva os resultados neste arquivo')
+    args = parser.parse_args()
+
+    emulator = Emulator(args.rom)
+    instrumentation = Instrumentation(emulator.cpu, emulator.mmu)
+    instrumentation.enable()
+    for _ in range(args.frames):
+        emulator.run_frame()
+    instrumentation.disable()
+
+    print(instrumentation.table())
+    if args.json:
+        instrumentation.to_json(args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import zlib
+from collections import deque
+from cpu import REGISTERS
+
+MEMORY_SIZE = 65536
+
+
+def xor_bytes(a, b):
+    # XOR feito em C (via int grande), muito mais rápido que um loop em Python
+    value = int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')
+    return value.to_bytes(MEMORY_SIZE, 'little')
+
+
+class Rewind:
+    """
+    Buffer circular de snapshots para voltar no tempo.
+
+    Guardamos apenas o snapshot mais recente completo. Cada entrada do buffer é o
+    delta (XOR + zlib, que comprime as sequências de zeros) que transforma um
+    snapshot no anterior, então descartar a entrada mais antiga nunca quebra a cadeia.
+    """
+
+    def __init__(self, cpu, mmu, ppu, interval=2, capacity=1800):
+        self.cpu = cpu
+        self.mmu = mmu
+        self.ppu = ppu
+
+        # interval=2 e capacity=1800 => ~60 segundos de rewind
+        self.interval = interval
+        self.entries = deque(maxlen=capacity)
+
+        self.frame_counter = 0
+        self.current_memory = None
+        self.current_registers = None
+
+    def capture_registers(self):
+        cpu = self.cpu
+        # A contagem da serial vai junto: voltar no meio de uma transferência
+        # não pode herdar a contagem do estado mais novo
+        return tuple(getattr(cpu, name) for name in REGISTERS) + (self.ppu.counter, self.mmu.serial_cycles)
+
+    def restore_registers(self, registers):
+        for name, value in zip(REGISTERS, registers):
+            setattr(self.cpu, name, value)
+        self.ppu.counter, self.mmu.serial_cycles = registers[len(REGISTERS):]
+
+    def on_frame(self):
+        self.frame_counter += 1
+        if self.frame_counter >= self.interval:
+            self.frame_counter = 0
+            self.push()
+
+    def push(self):
+        memory = bytes(self.mmu.memory)
+        registers = self.capture_registers()
+
+        if self.current_memory is not None:
+            delta = zlib.compress(xor_bytes(memory, self.current_memory), 1)
+            self.entries.append((delta, self.current_registers))
+
+        self.current_memory = memory
+        self.current_registers = registers
+
+    def step_back(self):
+        """
+        Volta um snapshot. Retorna False quando o buffer acabou
+        (nesse caso o estado fica no snapshot mais antigo disponível).
+        """
+        if self.current_memory is None:
+            return False
+
+        moved = False
+        if self.entries:
+            delta, registers = self.entries.pop()
+            self.current_memory = xor_bytes(self.current_memory, zlib.decompress(delta))
+            self.current_registers = registers
+            moved = True
+
+        self.mmu.memory[:] = self.current_memory
+        self.restore_registers(self.current_registers)
+        self.frame_counter = 0
+        return moved
+
+    def clear(self):
+        self.entries.clear()
+        self.current_memory = None
+        self.current_registers = None
+        self.frame_counter = 0
+
+    def memory_usage(self):
+        return sum(len(delta) for delta, _ in self.entries)
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import struct
+import zlib
+
+from emulator import Emulator, FRAME_RATE
+from mmu import BUTTONS
+
+SCREEN_WIDTH = 160
+SCREEN_HEIGHT = 144
+ROW_SIZE = SCREEN_WIDTH * 3
+FRAME_SIZE = ROW_SIZE * SCREEN_HEIGHT
+
+# Mensagem: tipo (1 byte) + tamanho do payload (4 bytes) + payload
+MESSAGE = struct.Struct('<cI')
+HELLO = struct.Struct('<HHB')      # largura, altura, bytes por pixel
+FRAME_HEADER = struct.Struct('<I')  # número do frame (o resto é zlib das runs)
+RUN = struct.Struct('<BB')          # primeira linha, quantidade de linhas
+
+MSG_HELLO = b'H'
+MSG_FRAME = b'F'
+MSG_INPUT = b'I'
+
+# Cliente com mais que isso pendente no socket pula frames em vez de acumular
+MAX_PENDING_BYTES = 256 * 1024
+
+
+def encode_delta(previous, current):
+    """
+    Delta entre dois frames: runs de linhas que mudaram (comparadas em C, linha a
+    linha), comprimidas com zlib. previous=None gera um frame completo.
+    """
+    runs = []
+    row = 0
+    while row < SCREEN_HEIGHT:
+        start = row * ROW_SIZE
+        if previous is not None and previous[start:start + ROW_SIZE] == current[start:start + ROW_SIZE]:
+            row += 1
+            continue
+
+        first = row
+        row += 1
+        while row < SCREEN_HEIGHT:
+            start = row * ROW_SIZE
+            if previous is not None and previous[start:start + ROW_SIZE] == current[start:start + ROW_SIZE]:
+                break
+            row += 1
+
+        runs.append(RUN.pack(first, row - first))
+        runs.append(current[first * ROW_SIZE:row * ROW_SIZE])
+
+    return zlib.compress(b''.join(runs), 1)
+
+
+def apply_delta(framebuffer, payload):
+    data = zlib.decompress(payload)
+    offset = 0
+    while offset < len(data):
+        first, count = RUN.unpack_from(data, offset)
+        offset += RUN.size
+        size = count * ROW_SIZE
+        framebuffer[first * ROW_SIZE:first * ROW_SIZE + size] = data[offset:offset + size]
+        offset += size
+
+
+def pack_message(kind, payload):
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+
+async def read_message(reader):
+    kind, size = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+    return kind, await reader.readexactly(size)
+
+
+class StreamServer:
+    """
+    Roda um emulador headless e transmite os frames como deltas para vários clientes.
+    O input de todos os clientes é combinado (OR) e aplicado na borda do frame.
+    """
+
+    def __init__(self, rom_path):
+        self.emulator = Emulator(rom_path)
+        self.clients = {}   # writer => {'frame': último frame enviado, 'buttons': máscara}
+        self.frame = bytes(FRAME_SIZE)
+
+    async def handle_client(self, reader, writer):
+        client = {'frame': None, 'buttons': 0}
+        self.clients[writer] = client
+        writer.write(pack_message(MSG_HELLO, HELLO.pack(SCREEN_WIDTH, SCREEN_HEIGHT, 3)))
+
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == MSG_INPUT and payload:
+                    client['buttons'] = payload[0]
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self.clients[writer]
+            writer.close()
+
+    def broadcast(self, frame_number):
+        previous = self.frame
+        current = bytes(self.emulator.ppu.buffer)
+        self.frame = current
+        shared = None  # delta contra o frame anterior, reaproveitado por quem está em dia
+
+        for writer, client in list(self.clients.items()):
+            if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                continue
+
+            if client['frame'] is previous:
+                if shared is None:
+                    shared = encode_delta(previous, current)
+                payload = shared
+            else:
+                payload = encode_delta(client['frame'], current)
+
+            writer.write(pack_message(MSG_FRAME, FRAME_HEADER.pack(frame_number) + payload))
+            client['frame'] = current
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / FRAME_RATE
+        deadline = loop.time()
+        mmu = self.emulator.mmu
+
+        while True:
+            buttons = 0
+            for client in self.clients.values():
+                buttons |= client['buttons']
+            if buttons != mmu.buttons_mask():
+                mmu.set_buttons_mask(buttons)
+
+            self.emulator.run_frame()
+            self.broadcast(self.emulator.frame_count)
+
+            deadline = max(deadline + period, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+
+
+class StreamClient:
+    def __init__(self):
+        self.framebuffer = bytearray(FRAME_SIZE)
+        self.frame_number = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host='127.0.0.1', port=8765, unix=None):
+        if unix:
+            self.reader, self.writer = await asyncio.open_unix_connection(unix)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        kind, payload = await read_message(self.reader)
+        if kind != MSG_HELLO or HELLO.unpack(payload) != (SCREEN_WIDTH, SCREEN_HEIGHT, 3):
+            raise ConnectionError('servidor de stream incompatível')
+
+    async def next_frame(self):
+        while True:
+            kind, payload = await read_message(self.reader)
+            if kind == MSG_FRAME:
+                (self.frame_number,) = FRAME_HEADER.unpack_from(payload)
+                apply_delta(self.framebuffer, payload[FRAME_HEADER.size:])
+                return self.framebuffer
+
+    def send_input(self, buttons_mask):
+        self.writer.write(pack_message(MSG_INPUT, bytes([buttons_mask])))
+
+
+async def serve(rom_path, host, port, unix):
+    server = StreamServer(rom_path)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle_client, unix)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port)
+
+    async with listener:
+        print(f"Transmitindo em {unix or f'{host}:{port}'}")
+        await server.run()
+
+
+async def view(host, port, unix):
+    import pygame
+    from main import load_key_map
+
+    key_map = load_key_map(pygame)
+
+    client = StreamClient()
+    await client.connect(host, port, unix)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2))
+    pygame.display.set_caption('Emulador Myu - stream')
+    buttons = 0
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in key_map:
+                bit = 1 << BUTTONS.index(key_map[event.key])
+                buttons = buttons | bit if event.type == pygame.KEYDOWN else buttons & ~bit
+                client.send_input(buttons)
+
+        framebuffer = await client.next_frame()
+        image = pygame.image.frombuffer(framebuffer, (SCREEN_WIDTH, SCREEN_HEIGHT), 'RGB')
+        screen.blit(pygame.transform.scale(image, (SCREEN_WIDTH * 2, SCREEN_HEIGHT * 2)), (0, 0))
+        pygame.display.flip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor/cliente de stream de frames')
+    parser.add_argument('mode', choices=['serve', 'view'])
+    parser.add_argument('--rom', default='roms/Tetris.gb')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='caminho de um Unix socket (no lugar de TCP)')
+    args = parser.parse_args()
+
+    if args.mode == 'serve':
+        asyncio.run(serve(args.rom, args.host, args.port, args.unix))
+    else:
+        asyncio.run(view(args.host, args.port, args.unix))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import struct
+import sys
+from array import array
+
+import hooks
+from instruction_set import instructions, cb_instruction_name
+
+MAGIC = b'MYUTRACE'
+# 2: ciclo com 64 bits (32 bits davam a volta em ~17 minutos emulados)
+VERSION = 2
+
+# Cada registro são 11 palavras de 16 bits (22 bytes):
+# PC, opcode | próximo byte << 8, AF, BC, DE, HL, SP, ciclo (4 palavras, da menos significativa)
+RECORD_WORDS = 11
+HEADER = struct.Struct('<8sHI')  # magic, versão, número de registros
+
+
+class Tracer:
+    """
+    Trace binário das últimas 'capacity' instruções num ring buffer pré-alocado.
+
+    O registro é feito no wrapper de handle_interrupts (logo antes do fetch, como
+    no profiling.Instrumentation), então guarda o estado antes da instrução executar.
+    """
+
+    def __init__(self, cpu, capacity=1_000_000):
+        self.cpu = cpu
+        self.capacity = capacity
+        self.ring = array('H', bytes(2 * RECORD_WORDS * capacity))
+        self.position = 0   # próximo registro a ser escrito
+        self.count = 0      # total de registros gravados (pode passar da capacidade)
+        self.cycles = 0
+        self.enabled = False
+
+    def enable(self):
+        if self.enabled:
+            return
+        cpu = self.cpu
+        memory = cpu.mmu.memory
+        ring = self.ring
+        end = len(ring)
+        def make_traced_interrupts(handle_interrupts):
+            def traced_interrupts():
+                handle_interrupts()
+                i = self.position
+                pc = cpu.PC & 0xFFFF
+                cycles = self.cycles
+                ring[i] = pc
+                ring[i + 1] = memory[pc] | (memory[(pc + 1) & 0xFFFF] << 8)
+                ring[i + 2] = (cpu.A << 8) | cpu.F
+                ring[i + 3] = (cpu.B << 8) | cpu.C
+                ring[i + 4] = (cpu.D << 8) | cpu.E
+                ring[i + 5] = (cpu.H << 8) | cpu.L
+                ring[i + 6] = cpu.SP
+                ring[i + 7] = cycles & 0xFFFF
+                ring[i + 8] = (cycles >> 16) & 0xFFFF
+                ring[i + 9] = (cycles >> 32) & 0xFFFF
+                ring[i + 10] = (cycles >> 48) & 0xFFFF
+                i += RECORD_WORDS
+                self.position = 0 if i >= end else i
+                self.count += 1
+            return traced_interrupts
+
+        def make_counted_step(step):
+            def counted_step():
+                cycles = step()
+                self.cycles += cycles
+                return cycles
+            return counted_step
+
+        hooks.install(self, cpu, 'handle_interrupts', make_traced_interrupts)
+        hooks.install(self, cpu, 'step', make_counted_step)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        hooks.remove(self)
+        self.enabled = False
+
+    def records(self):
+        """Registros em ordem cronológica (array de palavras)."""
+        if self.count < self.capacity:
+            return self.ring[:self.position]
+        return self.ring[self.position:] + self.ring[:self.position]
+
+    def dump(self, path):
+        records = self.records()
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(records) // RECORD_WORDS))
+            records.tofile(file)
+        return path
+
+    def install_crash_dump(self, path):
+        """Salva o trace automaticamente se o processo morrer com exceção."""
+        previous_hook = sys.excepthook
+
+        def hook(exc_type, exc, tb):
+            try:
+                self.dump(path)
+                print(f'Trace salvo em {path}', file=sys.stderr)
+            finally:
+                previous_hook(exc_type, exc, tb)
+
+        sys.excepthook = hook
+
+
+def read_trace(path):
+    with open(path, 'rb') as file:
+        magic, version, count = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} não é um trace válido')
+        records = array('H')
+        records.fromfile(file, count * RECORD_WORDS)
+    return records
+
+
+def mnemonic(opcode_word):
+    opcode = opcode_word & 0xFF
+    if opcode == 0xCB:
+        return cb_instruction_name(opcode_word >> 8)
+    instr = instructions.get(opcode)
+    return instr.name if instr else f'??? (0x{opcode:02X})'
+
+
+def decode(records, last=None):
+    total = len(records) // RECORD_WORDS
+    first = max(0, total - last) if last else 0
+
+    for n in range(first, total):
+        i = n * RECORD_WORDS
+        pc, op, af, bc, de, hl, sp, c0, c1, c2, c3 = records[i:i + RECORD_WORDS]
+        cycles = c0 | (c1 << 16) | (c2 << 32) | (c3 << 48)
+        yield (f'{cycles:14}  {pc:04X}  {op & 0xFF:02X}  {mnemonic(op):16} '
+               f'AF={af:04X} BC={bc:04X} DE={de:04X} HL={hl:04X} SP={sp:04X}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trace binário de instruções')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='roda a ROM headless gravando o trace')
+    run.add_argument('--rom', default='roms/Tetris.gb')
+    run.add_argument('--frames', type=int, default=60)
+    run.add_argument('--capacity', type=int, default=1_000_000)
+    run.add_argument('--out', default='trace.bin')
+
+    show = sub.add_parser('decode', help='decodifica um trace salvo')
+    show.add_argument('path')
+    show.add_argument('--last', type=int, help='mostra só os últimos N registros')
+
+    args = parser.parse_args()
+
+    if args.command == 'decode':
+        for line in decode(read_trace(args.path), args.last):
+            print(line)
+        return
+
+    from emulator import Emulator
+
+    emulator = Emulator(args.rom)
+    tracer = Tracer(emulator.cpu, args.capacity)
+    tracer.install_crash_dump(args.out)
+    tracer.enable()
+    for _ in range(args.frames):
+        emulator.run_frame()
+    tracer.dump(args.out)
+
+
+if __name__ == '__main__':
+    main()